@@ -0,0 +1,129 @@
+import numpy as np
+
+from automata.neighbours import count_neighbours, make_counter
+from automata.rules import TransitionTable
+
+
+class CellularAutomaton:
+    """Double-buffered uint8 automaton; ``step`` reuses its buffers so generations allocate nothing.
+
+    With ``sparse`` only the ``block_size``³ blocks holding non-zero cells, and the blocks around them, are
+    stepped; a dense step is used instead while more than ``dense_threshold`` of the blocks are active, or
+    when the rule can give birth with no live neighbour.
+    """
+
+    def __init__(self, grid: np.ndarray, rule: TransitionTable, counter: str = "shift",
+                 boundary: str = "constant", sparse: bool = False, block_size: int = 16,
+                 dense_threshold: float = 0.25) -> None:
+        self.rule = rule
+        self.boundary = boundary
+        self.state: np.ndarray = np.array(grid, dtype=np.uint8)
+        self._next = np.empty_like(self.state)
+        self._alive = np.empty(self.state.shape, dtype=bool)
+        self._counts = np.empty(self.state.shape, dtype=np.uint8)
+        self._index = np.empty(self.state.shape, dtype=np.intp)
+        self.counter_method = counter
+        self.counter = make_counter(counter, self.state.shape, rule.neighbourhood, boundary)
+        self.generation = 0
+
+        self.sparse = sparse
+        self.block_size = block_size
+        self.dense_threshold = dense_threshold
+        self.active_fraction = 1.0
+        self._occupied_blocks: np.ndarray = None
+
+    @property
+    def shape(self) -> tuple:
+        return self.state.shape
+
+    def step(self, n: int = 1) -> np.ndarray:
+        for _ in range(n):
+            if self.sparse and self.rule.table[0, 0] == 0:
+                self._step_sparse()
+            else:
+                self._step_dense()
+            self.generation += 1
+        return self.state
+
+    def _step_dense(self) -> None:
+        np.equal(self.state, self.rule.counted_state, out=self._alive)
+        self.counter.count(self._alive.view(np.uint8), self._counts)
+        self.rule.apply(self.state, self._counts, self._next, self._index)
+        self.state, self._next = self._next, self.state
+        self._occupied_blocks = None
+
+    def _step_sparse(self) -> None:
+        if self._occupied_blocks is None:
+            self._occupied_blocks = self._block_reduce(self.state != 0)
+
+        # A quiescent cell only changes next to a non-zero cell, so one block of margin covers every change
+        active = self._dilate_blocks(self._occupied_blocks)
+        self.active_fraction = np.count_nonzero(active) / active.size
+        if self.active_fraction > self.dense_threshold:
+            self._step_dense()
+            return
+
+        blocks = np.argwhere(active)
+        updates = [self._step_block(block) for block in blocks]
+        for block, (region, new_state) in zip(blocks, updates):
+            self.state[region] = new_state
+            self._occupied_blocks[tuple(block)] = new_state.any()
+
+    def _step_block(self, block: np.ndarray) -> tuple:
+        low = block * self.block_size
+        high = np.minimum(low + self.block_size, self.state.shape)
+        indices = []
+        valid = []
+        for lo, hi, size in zip(low, high, self.state.shape):
+            axis_indices = np.arange(lo - 1, hi + 1)
+            if self.boundary == "periodic":
+                axis_indices %= size
+                valid.append(None)
+            else:
+                valid.append((axis_indices >= 0) & (axis_indices < size))
+                axis_indices = np.clip(axis_indices, 0, size - 1)
+            indices.append(axis_indices)
+
+        halo = self.state[np.ix_(*indices)]
+        alive = (halo == self.rule.counted_state).view(np.uint8)
+        for axis, axis_valid in enumerate(valid):
+            if axis_valid is not None:
+                index = [slice(None)] * 3
+                index[axis] = ~axis_valid
+                alive[tuple(index)] = 0
+        counts = count_neighbours(alive, neighbourhood=self.rule.neighbourhood)
+
+        inner = (slice(1, -1),) * 3
+        new_state = self.rule.table[halo[inner], counts[inner]]
+        region = tuple(slice(lo, hi) for lo, hi in zip(low, high))
+        return region, new_state
+
+    def _block_reduce(self, mask: np.ndarray) -> np.ndarray:
+        for axis, size in enumerate(mask.shape):
+            mask = np.logical_or.reduceat(mask, np.arange(0, size, self.block_size), axis=axis)
+        return mask
+
+    def _dilate_blocks(self, blocks: np.ndarray) -> np.ndarray:
+        dilated = blocks.copy()
+        for axis in range(3):
+            source = dilated.copy()
+            if self.boundary == "periodic":
+                dilated |= np.roll(source, 1, axis=axis)
+                dilated |= np.roll(source, -1, axis=axis)
+                continue
+            index = [slice(None)] * 3
+            shifted = [slice(None)] * 3
+            index[axis], shifted[axis] = slice(1, None), slice(None, -1)
+            dilated[tuple(index)] |= source[tuple(shifted)]
+            dilated[tuple(shifted)] |= source[tuple(index)]
+        return dilated
+
+    def set_rule(self, rule: TransitionTable) -> None:
+        if rule.neighbourhood != self.rule.neighbourhood:
+            self.counter = make_counter(self.counter_method, self.state.shape, rule.neighbourhood, self.boundary)
+        self.rule = rule
+
+    def set_state(self, grid: np.ndarray) -> None:
+        self.state[...] = grid
+        self.generation = 0
+        self._occupied_blocks = None
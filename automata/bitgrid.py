@@ -0,0 +1,173 @@
+from typing import List
+
+import numpy as np
+
+from automata.neighbours import BOUNDARIES
+from automata.rules import TransitionTable
+
+WORD_BITS = 64
+_ONE = np.uint64(1)
+_TOP = np.uint64(WORD_BITS - 1)
+
+
+def pack_grid(grid: np.ndarray) -> np.ndarray:
+    """Pack a 0/1 (X, Y, Z) grid into uint64 words along z, bit ``i`` of word ``k`` being cell ``64 * k + i``."""
+    grid = np.asarray(grid) != 0
+    padding = -grid.shape[2] % WORD_BITS
+    if padding:
+        grid = np.pad(grid, ((0, 0), (0, 0), (0, padding)))
+    packed = np.packbits(grid, axis=2, bitorder="little")
+    return np.ascontiguousarray(packed).view("<u8").astype(np.uint64)
+
+
+def unpack_grid(words: np.ndarray, depth: int) -> np.ndarray:
+    """Dense uint8 (X, Y, depth) grid of packed words."""
+    packed = np.ascontiguousarray(words.astype("<u8")).view(np.uint8)
+    return np.unpackbits(packed, axis=2, bitorder="little")[:, :, :depth]
+
+
+class BitPackedAutomaton:
+    """Two-state automaton stored one bit per cell, neighbours being summed with bit-sliced adders.
+
+    Cells are packed 64 per uint64 word along z, which needs a depth multiple of 64 for periodic boundaries.
+    """
+
+    def __init__(self, grid: np.ndarray, rule: TransitionTable, boundary: str = "constant") -> None:
+        if rule.states != 2:
+            raise ValueError("Bit-packed grids only hold two-state rules")
+        if boundary not in BOUNDARIES:
+            raise ValueError(f"Unknown boundary {boundary!r}, expected one of {list(BOUNDARIES)}")
+        grid = np.asarray(grid)
+        if boundary == "periodic" and grid.shape[2] % WORD_BITS:
+            raise ValueError(f"Periodic bit-packed grids need a depth multiple of {WORD_BITS}")
+
+        self.shape = grid.shape
+        self.depth = grid.shape[2]
+        self.boundary = boundary
+        self.neighbourhood = rule.neighbourhood
+        self.birth = np.flatnonzero(rule.table[0] == 1).tolist()
+        self.survive = np.flatnonzero(rule.table[1] == 1).tolist()
+        self.words = pack_grid(grid)
+        self.generation = 0
+
+        # padding bits past the depth must stay dead
+        self._last_word_mask = None
+        if self.depth % WORD_BITS:
+            self._last_word_mask = np.uint64((1 << (self.depth % WORD_BITS)) - 1)
+
+    @property
+    def state(self) -> np.ndarray:
+        return unpack_grid(self.words, self.depth)
+
+    @property
+    def nbytes(self) -> int:
+        return self.words.nbytes
+
+    def step(self, n: int = 1) -> np.ndarray:
+        for _ in range(n):
+            self.words = self._next_words(self.words)
+            if self._last_word_mask is not None:
+                self.words[:, :, -1] &= self._last_word_mask
+            self.generation += 1
+        return self.words
+
+    def _next_words(self, alive: np.ndarray) -> np.ndarray:
+        if self.neighbourhood == "moore":
+            # the 3x3x3 box sum includes the cell itself, so survivals are matched one count higher
+            total = [alive]
+            for axis in (2, 1, 0):
+                total = _add(_add(total, [self._shift(plane, axis, 1) for plane in total]),
+                             [self._shift(plane, axis, -1) for plane in total])
+            born = _match(total, self.birth)
+            kept = _match(total, [count + 1 for count in self.survive])
+        else:
+            neighbours = [self._shift(alive, axis, direction) for axis in (0, 1, 2) for direction in (1, -1)]
+            total = [neighbours[0]]
+            for plane in neighbours[1:]:
+                total = _add(total, [plane])
+            born = _match(total, self.birth)
+            kept = _match(total, self.survive)
+        return (born & ~alive) | (kept & alive)
+
+    def _shift(self, words: np.ndarray, axis: int, direction: int) -> np.ndarray:
+        """Words holding, for every cell, its neighbour at ``-direction`` along ``axis``."""
+        periodic = self.boundary == "periodic"
+        if axis != 2:
+            if periodic:
+                return np.roll(words, direction, axis=axis)
+            shifted = np.zeros_like(words)
+            target = [slice(None)] * 3
+            source = [slice(None)] * 3
+            if direction > 0:
+                target[axis], source[axis] = slice(1, None), slice(None, -1)
+            else:
+                target[axis], source[axis] = slice(None, -1), slice(1, None)
+            shifted[tuple(target)] = words[tuple(source)]
+            return shifted
+
+        if direction > 0:
+            shifted = words << _ONE
+            shifted[:, :, 1:] |= words[:, :, :-1] >> _TOP
+            if periodic:
+                shifted[:, :, 0] |= words[:, :, -1] >> _TOP
+        else:
+            shifted = words >> _ONE
+            shifted[:, :, :-1] |= words[:, :, 1:] << _TOP
+            if periodic:
+                shifted[:, :, -1] |= words[:, :, 0] << _TOP
+        return shifted
+
+
+def _add(a: List[np.ndarray], b: List[np.ndarray]) -> List[np.ndarray]:
+    """Ripple-carry sum of two numbers stored as lists of bit planes, least significant first."""
+    result = []
+    carry = None
+    for i in range(max(len(a), len(b))):
+        terms = [term for term in (a[i] if i < len(a) else None, b[i] if i < len(b) else None, carry)
+                 if term is not None]
+        if len(terms) == 1:
+            result.append(terms[0])
+            carry = None
+        elif len(terms) == 2:
+            result.append(terms[0] ^ terms[1])
+            carry = terms[0] & terms[1]
+        else:
+            partial = terms[0] ^ terms[1]
+            result.append(partial ^ terms[2])
+            carry = (terms[0] & terms[1]) | (terms[2] & partial)
+    if carry is not None:
+        result.append(carry)
+    return result
+
+
+def _match(planes: List[np.ndarray], values: List[int]) -> np.ndarray:
+    """Bits whose bit-sliced number is one of ``values``."""
+    matched = _match_planes(planes, {value for value in values if not value >> len(planes)})
+    if matched is True:
+        return ~np.zeros_like(planes[0])
+    if matched is False:
+        return np.zeros_like(planes[0])
+    return matched
+
+
+def _match_planes(planes: List[np.ndarray], values: set):
+    """Split on the most significant plane so ranges of values collapse; True/False stand for all/no bits."""
+    if not values:
+        return False
+    if len(values) == 1 << len(planes):
+        return True
+    half = 1 << (len(planes) - 1)
+    top = planes[-1]
+    low = _match_planes(planes[:-1], {value for value in values if value < half})
+    high = _match_planes(planes[:-1], {value - half for value in values if value >= half})
+    if low is high:
+        return low
+    if low is False:
+        return top if high is True else top & high
+    if high is False:
+        return ~top if low is True else ~top & low
+    if low is True:
+        return ~top | high
+    if high is True:
+        return top | low
+    return (top & high) | (~top & low)
@@ -0,0 +1,253 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from automata.neighbours import count_neighbours
+from automata.rules import TransitionTable
+
+# Dense conversions work on whole nodes up to this level (16³ cells)
+_DENSE_LEVEL = 4
+
+
+class Node:
+    """Canonical octree node of ``2**level`` cells a side; children are ordered ``x * 4 + y * 2 + z``."""
+
+    __slots__ = ("level", "children", "population", "results")
+
+    def __init__(self, level: int, children: Tuple["Node", ...], population: int) -> None:
+        self.level = level
+        self.children = children
+        self.population = population
+        self.results: Dict[int, "Node"] = {}
+
+
+class HashLifeAutomaton:
+    """Two-state outer totalistic automaton on an unbounded grid, advanced with 3D HashLife.
+
+    The world is a hash-consed octree: equal subcubes are one shared node and each node memoizes its
+    centre advanced by ``2**j`` generations, so repetitive or periodic patterns are advanced in
+    large power of two jumps for the cost of their distinct subcubes. Once the node table exceeds
+    ``max_nodes`` the nodes unreachable from the current world are dropped together with the memoized
+    results.
+
+    Unlike the grid engines the world has no boundary; ``state`` is the window of the starting grid
+    and ``cells``/``to_grid`` export anything else.
+    """
+
+    def __init__(self, grid: np.ndarray, rule: TransitionTable, max_nodes: int = 2_000_000) -> None:
+        if rule.states != 2:
+            raise ValueError("HashLife only runs two-state rules")
+        if rule.table[0, 0]:
+            raise ValueError("HashLife needs empty space to stay empty (no birth on 0 neighbours)")
+        self.rule = rule
+        self.max_nodes = max_nodes
+        self.shape = np.asarray(grid).shape
+        self._table: Dict[Tuple[Node, ...], Node] = {}
+        self._empty: List[Node] = []
+        self._leaves = (Node(0, (), 0), Node(0, (), 1))
+        self.set_state(grid)
+
+    @property
+    def population(self) -> int:
+        return self.root.population
+
+    @property
+    def node_count(self) -> int:
+        return len(self._table)
+
+    @property
+    def state(self) -> np.ndarray:
+        return self.to_grid((0, 0, 0), self.shape)
+
+    def set_state(self, grid: np.ndarray) -> None:
+        grid = np.asarray(grid) != 0
+        level = max(_DENSE_LEVEL - 1, int(np.ceil(np.log2(max(grid.shape)))))
+        padded = np.zeros((1 << level,) * 3, dtype=bool)
+        padded[:grid.shape[0], :grid.shape[1], :grid.shape[2]] = grid
+        self.root = self._from_dense(padded, level)
+        self.origin = np.zeros(3, dtype=np.int64)
+        self.generation = 0
+
+    def step(self, n: int = 1) -> int:
+        """Advance ``n`` generations, one HashLife jump per set bit of ``n``; returns the generation."""
+        j = 0
+        while n:
+            if n & 1:
+                self._advance_pow2(j)
+            n >>= 1
+            j += 1
+        return self.generation
+
+    def step_pow2(self, k: int) -> int:
+        """Advance ``2**k`` generations in a single jump."""
+        self._advance_pow2(k)
+        return self.generation
+
+    def cells(self) -> np.ndarray:
+        """(N, 3) int64 coordinates of the live cells, e.g. for ``Scene.add_cubes_from_positions``."""
+        found = []
+        self._collect_cells(self.root, self.origin, found)
+        if not found:
+            return np.empty((0, 3), dtype=np.int64)
+        return np.concatenate(found)
+
+    def bounding_box(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Inclusive lower and exclusive upper corner of the live cells."""
+        cells = self.cells()
+        if len(cells) == 0:
+            return np.zeros(3, dtype=np.int64), np.zeros(3, dtype=np.int64)
+        return cells.min(axis=0), cells.max(axis=0) + 1
+
+    def to_grid(self, low: Tuple[int, int, int] = None, high: Tuple[int, int, int] = None) -> np.ndarray:
+        """Dense uint8 grid of the ``[low, high)`` box, by default the bounding box of the live cells."""
+        if low is None or high is None:
+            low, high = self.bounding_box()
+        low, high = np.asarray(low, dtype=np.int64), np.asarray(high, dtype=np.int64)
+        out = np.zeros(tuple(high - low), dtype=np.uint8)
+        self._fill(self.root, self.origin, low, high, out)
+        return out
+
+    def _advance_pow2(self, j: int) -> None:
+        # The pattern must sit in the central quarter of a root big enough for the jump, so that the
+        # result (the central half, 2**j generations later) still holds everything it grows into
+        while self.root.level < j + 3 or not self._border_empty(self.root):
+            self._expand()
+        self._expand()
+        shift = 1 << (self.root.level - 2)
+        self.root = self._successor(self.root, j)
+        self.origin += shift
+        self.generation += 1 << j
+        if len(self._table) > self.max_nodes:
+            self._collect_garbage()
+
+    def _join(self, children: Tuple[Node, ...]) -> Node:
+        node = self._table.get(children)
+        if node is None:
+            node = Node(children[0].level + 1, children, sum(child.population for child in children))
+            self._table[children] = node
+        return node
+
+    def _empty_node(self, level: int) -> Node:
+        while len(self._empty) <= level:
+            if not self._empty:
+                self._empty.append(self._leaves[0])
+            else:
+                self._empty.append(self._join((self._empty[-1],) * 8))
+        return self._empty[level]
+
+    def _expand(self) -> None:
+        """Double the root around its centre, the old root becoming the central half."""
+        level = self.root.level
+        empty = self._empty_node(level - 1)
+        children = []
+        for index, child in enumerate(self.root.children):
+            grandchildren = [empty] * 8
+            grandchildren[7 - index] = child
+            children.append(self._join(tuple(grandchildren)))
+        self.root = self._join(tuple(children))
+        self.origin -= 1 << (level - 1)
+
+    @staticmethod
+    def _border_empty(node: Node) -> bool:
+        # every child must hold all of its population in its grandchild touching the centre
+        return all(child.population == child.children[7 - index].population
+                   for index, child in enumerate(node.children))
+
+    def _centre(self, node: Node) -> Node:
+        return self._join(tuple(child.children[7 - index] for index, child in enumerate(node.children)))
+
+    def _successor(self, node: Node, j: int) -> Node:
+        """Central half of ``node`` advanced ``2**j`` generations, ``j <= node.level - 2``."""
+        if node.population == 0:
+            return self._empty_node(node.level - 1)
+        result = node.results.get(j)
+        if result is not None:
+            return result
+
+        level = node.level
+        if level == 2:
+            result = self._base_successor(node)
+        else:
+            grand = [[[node.children[(x >> 1) * 4 + (y >> 1) * 2 + (z >> 1)].children[(x & 1) * 4 + (y & 1) * 2 + (z & 1)]
+                       for z in range(4)] for y in range(4)] for x in range(4)]
+            full = j == level - 2
+            # 27 overlapping subcubes of half the size, then 8 overlapping cubes of their results
+            middle = [[[None] * 3 for _ in range(3)] for _ in range(3)]
+            for x in range(3):
+                for y in range(3):
+                    for z in range(3):
+                        sub = self._join(tuple(grand[x + a][y + b][z + c]
+                                               for a in (0, 1) for b in (0, 1) for c in (0, 1)))
+                        middle[x][y][z] = self._successor(sub, level - 3) if full else self._centre(sub)
+            step = level - 3 if full else j
+            result = self._join(tuple(
+                self._successor(self._join(tuple(middle[x + a][y + b][z + c]
+                                                 for a in (0, 1) for b in (0, 1) for c in (0, 1))), step)
+                for x in (0, 1) for y in (0, 1) for z in (0, 1)))
+        node.results[j] = result
+        return result
+
+    def _base_successor(self, node: Node) -> Node:
+        alive = self._to_dense(node).astype(np.uint8)
+        counts = count_neighbours(alive, neighbourhood=self.rule.neighbourhood)
+        following = self.rule.table[alive, counts]
+        return self._from_dense(following[1:3, 1:3, 1:3] != 0, 1)
+
+    def _from_dense(self, grid: np.ndarray, level: int) -> Node:
+        if level == 0:
+            return self._leaves[int(grid[0, 0, 0])]
+        if not grid.any():
+            return self._empty_node(level)
+        half = 1 << (level - 1)
+        return self._join(tuple(self._from_dense(grid[x:x + half, y:y + half, z:z + half], level - 1)
+                                for x in (0, half) for y in (0, half) for z in (0, half)))
+
+    def _to_dense(self, node: Node) -> np.ndarray:
+        size = 1 << node.level
+        out = np.zeros((size, size, size), dtype=bool)
+        if node.level == 0:
+            out[0, 0, 0] = node.population
+        elif node.population:
+            half = size >> 1
+            for index, child in enumerate(node.children):
+                if child.population:
+                    x, y, z = (index >> 2) * half, ((index >> 1) & 1) * half, (index & 1) * half
+                    out[x:x + half, y:y + half, z:z + half] = self._to_dense(child)
+        return out
+
+    def _collect_cells(self, node: Node, origin: np.ndarray, found: List[np.ndarray]) -> None:
+        if node.population == 0:
+            return
+        if node.level <= _DENSE_LEVEL:
+            found.append(np.argwhere(self._to_dense(node)) + origin)
+            return
+        half = 1 << (node.level - 1)
+        for index, child in enumerate(node.children):
+            self._collect_cells(child, origin + half * np.array([index >> 2, (index >> 1) & 1, index & 1]), found)
+
+    def _fill(self, node: Node, origin: np.ndarray, low: np.ndarray, high: np.ndarray, out: np.ndarray) -> None:
+        end = origin + (1 << node.level)
+        if node.population == 0 or np.any(end <= low) or np.any(origin >= high):
+            return
+        if node.level <= _DENSE_LEVEL:
+            start, stop = np.maximum(origin, low), np.minimum(end, high)
+            dense = self._to_dense(node)
+            out[tuple(slice(a, b) for a, b in zip(start - low, stop - low))] = \
+                dense[tuple(slice(a, b) for a, b in zip(start - origin, stop - origin))]
+            return
+        half = 1 << (node.level - 1)
+        for index, child in enumerate(node.children):
+            self._fill(child, origin + half * np.array([index >> 2, (index >> 1) & 1, index & 1]), low, high, out)
+
+    def _collect_garbage(self) -> None:
+        """Keep only the nodes reachable from the world (and the empty nodes) and forget memoized results."""
+        table = {}
+        stack = [self.root] + self._empty[1:]
+        while stack:
+            node = stack.pop()
+            if node.level == 0 or node.children in table:
+                continue
+            node.results.clear()
+            table[node.children] = node
+            stack.extend(node.children)
+        self._table = table
@@ -0,0 +1,189 @@
+import mmap
+import os
+import struct
+import threading
+import zlib
+from bisect import bisect_right
+from typing import List, Tuple
+
+import numpy as np
+
+MAGIC = b"CAHIST01"
+INDEX_MAGIC = b"CAHIDX01"
+KEYFRAME, DELTA = 0, 1
+
+# magic, shape, keyframe interval, first generation
+_HEADER = struct.Struct("<8s3iiq")
+# kind, generation, payload length
+_RECORD = struct.Struct("<BqI")
+# index offset, record count, magic
+_FOOTER = struct.Struct("<qq8s")
+
+
+class GenerationHistory:
+    """Append-only file of uint8 generations, stored as zlib-compressed XOR deltas with periodic keyframes.
+
+    Any generation is decoded from the closest keyframe at or before it (found by binary search), so
+    seeking costs at most ``keyframe_interval`` deltas whatever the length of the run. Records are read
+    through a memory map; the index is written as a footer on ``close`` and rebuilt by scanning the
+    records when a run was interrupted before that.
+    """
+
+    def __init__(self, path: str, shape: Tuple[int, int, int] = None, keyframe_interval: int = 64,
+                 first_generation: int = 0, level: int = 1) -> None:
+        self.path = path
+        self.level = level
+        self.lock = threading.Lock()
+        self._offsets: List[int] = []
+        self._kinds: List[int] = []
+        self._keyframes: List[int] = []
+        self._map: mmap.mmap = None
+        self._cache: Tuple[int, np.ndarray] = None
+        self._previous: np.ndarray = None
+
+        if shape is not None:
+            self.writable = True
+            self.shape = tuple(int(size) for size in shape)
+            self.keyframe_interval = keyframe_interval
+            self.first_generation = first_generation
+            self._file = open(path, "w+b")
+            self._file.write(_HEADER.pack(MAGIC, *self.shape, keyframe_interval, first_generation))
+        else:
+            self.writable = False
+            self._file = open(path, "rb")
+            self._read_header()
+            self._read_index()
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __enter__(self) -> "GenerationHistory":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def last_generation(self) -> int:
+        return self.first_generation + len(self._offsets) - 1
+
+    @property
+    def nbytes(self) -> int:
+        return os.path.getsize(self.path)
+
+    @property
+    def raw_nbytes(self) -> int:
+        return len(self._offsets) * int(np.prod(self.shape))
+
+    def append(self, state: np.ndarray, keyframe: bool = False) -> int:
+        """Store the next generation and return its number; ``keyframe`` forces a full copy (e.g. after a reset)."""
+        if not self.writable:
+            raise ValueError(f"{self.path} was opened read-only")
+        state = np.ascontiguousarray(state, dtype=np.uint8)
+        if state.shape != self.shape:
+            raise ValueError(f"Expected a grid of shape {self.shape}, got {state.shape}")
+
+        with self.lock:
+            index = len(self._offsets)
+            keyframe = keyframe or self._previous is None or index - self._keyframes[-1] >= self.keyframe_interval
+            if keyframe:
+                payload = zlib.compress(state, self.level)
+                self._keyframes.append(index)
+                self._previous = state.copy()
+            else:
+                payload = zlib.compress(np.bitwise_xor(self._previous, state), self.level)
+                self._previous[...] = state
+
+            self._file.seek(0, os.SEEK_END)
+            self._file.write(_RECORD.pack(KEYFRAME if keyframe else DELTA, self.first_generation + index,
+                                          len(payload)))
+            self._offsets.append(self._file.tell())
+            self._kinds.append(KEYFRAME if keyframe else DELTA)
+            self._file.write(payload)
+            return self.first_generation + index
+
+    def get(self, generation: int) -> np.ndarray:
+        """Decode ``generation``, reusing the last decoded one when it lies on the way."""
+        index = generation - self.first_generation
+        if not 0 <= index < len(self._offsets):
+            raise IndexError(f"Generation {generation} is not in [{self.first_generation}, {self.last_generation}]")
+
+        with self.lock:
+            keyframe = self._keyframes[bisect_right(self._keyframes, index) - 1]
+            if self._cache is not None and keyframe <= self._cache[0] <= index:
+                start, state = self._cache[0], self._cache[1]
+            else:
+                start, state = keyframe, self._decode(keyframe)
+            for position in range(start + 1, index + 1):
+                if self._kinds[position] == KEYFRAME:
+                    state = self._decode(position)
+                else:
+                    np.bitwise_xor(state, self._decode(position), out=state)
+            self._cache = (index, state)
+            return state.copy()
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        if self.writable:
+            self._write_index()
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def _decode(self, index: int) -> np.ndarray:
+        data = self._mapped()
+        offset = self._offsets[index]
+        _, _, length = _RECORD.unpack_from(data, offset - _RECORD.size)
+        raw = zlib.decompress(data[offset:offset + length])
+        return np.frombuffer(raw, dtype=np.uint8).reshape(self.shape).copy()
+
+    def _mapped(self) -> mmap.mmap:
+        """Map of the file, re-created when appends made it grow."""
+        if self.writable:
+            self._file.flush()
+        size = os.fstat(self._file.fileno()).st_size
+        if self._map is None or len(self._map) < size:
+            if self._map is not None:
+                self._map.close()
+            self._map = mmap.mmap(self._file.fileno(), size, access=mmap.ACCESS_READ)
+        return self._map
+
+    def _read_header(self) -> None:
+        magic, *header = _HEADER.unpack(self._file.read(_HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a generation history file")
+        self.shape = tuple(header[:3])
+        self.keyframe_interval, self.first_generation = header[3:]
+
+    def _read_index(self) -> None:
+        data = self._mapped()
+        if len(data) >= _HEADER.size + _FOOTER.size:
+            index_offset, count, magic = _FOOTER.unpack_from(data, len(data) - _FOOTER.size)
+            if magic == INDEX_MAGIC:
+                self._offsets = np.frombuffer(data, np.int64, count, index_offset).tolist()
+                self._kinds = np.frombuffer(data, np.uint8, count, index_offset + 8 * count).tolist()
+                self._keyframes = [i for i, kind in enumerate(self._kinds) if kind == KEYFRAME]
+                return
+
+        # No footer: the run was not closed, rebuild the index from the record headers
+        offset = _HEADER.size
+        while offset + _RECORD.size <= len(data):
+            kind, generation, length = _RECORD.unpack_from(data, offset)
+            offset += _RECORD.size
+            if kind not in (KEYFRAME, DELTA) or generation != self.first_generation + len(self._offsets) \
+                    or offset + length > len(data):
+                break
+            if kind == KEYFRAME:
+                self._keyframes.append(len(self._offsets))
+            self._offsets.append(offset)
+            self._kinds.append(kind)
+            offset += length
+
+    def _write_index(self) -> None:
+        self._file.seek(0, os.SEEK_END)
+        index_offset = self._file.tell()
+        self._file.write(np.asarray(self._offsets, dtype=np.int64).tobytes())
+        self._file.write(np.asarray(self._kinds, dtype=np.uint8).tobytes())
+        self._file.write(_FOOTER.pack(index_offset, len(self._offsets), INDEX_MAGIC))
@@ -0,0 +1,109 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+NEIGHBOURHOODS = {"moore": 26, "von_neumann": 6}
+BOUNDARIES = ("constant", "periodic")
+
+
+def neighbourhood_kernel(neighbourhood: str = "moore") -> np.ndarray:
+    if neighbourhood == "moore":
+        kernel = np.ones((3, 3, 3), dtype=np.uint8)
+    elif neighbourhood == "von_neumann":
+        kernel = np.zeros((3, 3, 3), dtype=np.uint8)
+        kernel[0, 1, 1] = kernel[2, 1, 1] = 1
+        kernel[1, 0, 1] = kernel[1, 2, 1] = 1
+        kernel[1, 1, 0] = kernel[1, 1, 2] = 1
+    else:
+        raise ValueError(f"Unknown neighbourhood {neighbourhood!r}, expected one of {list(NEIGHBOURHOODS)}")
+    kernel[1, 1, 1] = 0
+    return kernel
+
+
+class NeighbourCounter(ABC):
+    """Counts the live neighbours of every cell of a uint8 0/1 grid into a preallocated uint8 ``out``."""
+
+    def __init__(self, shape: tuple, neighbourhood: str = "moore", boundary: str = "constant") -> None:
+        if neighbourhood not in NEIGHBOURHOODS:
+            raise ValueError(f"Unknown neighbourhood {neighbourhood!r}, expected one of {list(NEIGHBOURHOODS)}")
+        if boundary not in BOUNDARIES:
+            raise ValueError(f"Unknown boundary {boundary!r}, expected one of {list(BOUNDARIES)}")
+        self.shape = tuple(shape)
+        self.neighbourhood = neighbourhood
+        self.boundary = boundary
+
+    @abstractmethod
+    def count(self, alive: np.ndarray, out: np.ndarray) -> np.ndarray:
+        pass
+
+
+class ConvolveCounter(NeighbourCounter):
+    """``scipy.ndimage.convolve`` with a uint8 kernel, written straight into ``out``."""
+
+    def __init__(self, shape: tuple, neighbourhood: str = "moore", boundary: str = "constant") -> None:
+        super().__init__(shape, neighbourhood, boundary)
+        self.kernel = neighbourhood_kernel(neighbourhood)
+        self.mode = "wrap" if boundary == "periodic" else "constant"
+
+    def count(self, alive: np.ndarray, out: np.ndarray) -> np.ndarray:
+        from scipy.ndimage import convolve
+
+        convolve(alive, self.kernel, output=out, mode=self.mode, cval=0)
+        return out
+
+
+class ShiftCounter(NeighbourCounter):
+    """Shifted slice additions into reused buffers: separable box sums for Moore, six shifts for von Neumann."""
+
+    def __init__(self, shape: tuple, neighbourhood: str = "moore", boundary: str = "constant") -> None:
+        super().__init__(shape, neighbourhood, boundary)
+        self._partial = np.empty(self.shape, dtype=np.uint8)
+        self._partial2 = np.empty(self.shape, dtype=np.uint8)
+
+    def count(self, alive: np.ndarray, out: np.ndarray) -> np.ndarray:
+        if self.neighbourhood == "moore":
+            self._box_sum(alive, self._partial, 0)
+            self._box_sum(self._partial, self._partial2, 1)
+            self._box_sum(self._partial2, out, 2)
+            np.subtract(out, alive, out=out)
+            return out
+
+        out[...] = 0
+        for axis in range(3):
+            self._add_shifted(alive, out, axis)
+        return out
+
+    def _box_sum(self, source: np.ndarray, out: np.ndarray, axis: int) -> None:
+        np.copyto(out, source)
+        self._add_shifted(source, out, axis)
+
+    def _add_shifted(self, source: np.ndarray, out: np.ndarray, axis: int) -> None:
+        """Add the two axis-neighbours of every cell of ``source`` to ``out``."""
+        def take(start, stop):
+            index = [slice(None)] * 3
+            index[axis] = slice(start, stop)
+            return tuple(index)
+
+        np.add(out[take(1, None)], source[take(None, -1)], out=out[take(1, None)])
+        np.add(out[take(None, -1)], source[take(1, None)], out=out[take(None, -1)])
+        if self.boundary == "periodic":
+            np.add(out[take(0, 1)], source[take(-1, None)], out=out[take(0, 1)])
+            np.add(out[take(-1, None)], source[take(0, 1)], out=out[take(-1, None)])
+
+
+COUNTERS = {"convolve": ConvolveCounter, "shift": ShiftCounter}
+
+
+def make_counter(method: str, shape: tuple, neighbourhood: str = "moore", boundary: str = "constant") -> NeighbourCounter:
+    if method not in COUNTERS:
+        raise ValueError(f"Unknown neighbour counter {method!r}, expected one of {list(COUNTERS)}")
+    return COUNTERS[method](shape, neighbourhood, boundary)
+
+
+def count_neighbours(alive: np.ndarray, out: np.ndarray = None, neighbourhood: str = "moore",
+                     boundary: str = "constant", method: str = "shift") -> np.ndarray:
+    """One-off neighbour count of a 0/1 grid, written into ``out`` when given."""
+    alive = np.asarray(alive, dtype=np.uint8)
+    if out is None:
+        out = np.empty(alive.shape, dtype=np.uint8)
+    return make_counter(method, alive.shape, neighbourhood, boundary).count(alive, out)
@@ -0,0 +1,82 @@
+from functools import lru_cache
+
+import numpy as np
+
+PERIOD = 256
+
+
+class GradientNoise:
+    """Seeded Perlin gradient noise in 2D or 3D, evaluated over whole arrays of points at once.
+
+    Values lie roughly in [-1, 1] and the same seed always gives the same field.
+    """
+
+    def __init__(self, seed: int = 0, dims: int = 2) -> None:
+        if dims not in (2, 3):
+            raise ValueError(f"Gradient noise is 2D or 3D, not {dims}D")
+        rng = np.random.default_rng(seed)
+        self.dims = dims
+        self.permutation = np.tile(rng.permutation(PERIOD), 2)
+        gradients = rng.normal(size=(PERIOD, dims))
+        self.gradients = gradients / np.linalg.norm(gradients, axis=1, keepdims=True)
+        # each octave samples a far away part of the lattice so octaves do not line up
+        self.octave_offsets = rng.uniform(0, PERIOD, size=(32, dims))
+
+    def __call__(self, points: np.ndarray) -> np.ndarray:
+        """Noise at (..., dims) ``points``."""
+        points = np.asarray(points, dtype=np.float64)
+        floors = np.floor(points)
+        local = [points[..., axis] - floors[..., axis] for axis in range(self.dims)]
+        cells = [floors[..., axis].astype(np.int64) % PERIOD for axis in range(self.dims)]
+        fades = [t * t * t * (t * (t * 6 - 15) + 10) for t in local]
+
+        # hash the corners axis by axis so that corners share their first lookups
+        hashes = {(): 0}
+        for axis in range(self.dims):
+            hashes = {corner + (bit,): self.permutation[hashed + cells[axis] + bit]
+                      for corner, hashed in hashes.items() for bit in (0, 1)}
+
+        values = {}
+        for corner, hashed in hashes.items():
+            gradients = self.gradients[hashed]
+            values[corner] = sum(gradients[..., axis] * (local[axis] - bit) for axis, bit in enumerate(corner))
+        # interpolate the corner values away, last axis first
+        for axis in reversed(range(self.dims)):
+            values = {corner: values[corner + (0,)] + fades[axis] * (values[corner + (1,)] - values[corner + (0,)])
+                      for corner in {key[:axis] for key in values}}
+        # unit gradients reach at most sqrt(dims) / 2
+        return values[()] * (2 / np.sqrt(self.dims))
+
+    def fractal(self, points: np.ndarray, octaves: int = 1, persistence: float = 0.5,
+                lacunarity: float = 2.0) -> np.ndarray:
+        """Sum of ``octaves`` noise layers, each ``lacunarity`` times finer and ``persistence`` times weaker,
+        normalised back to roughly [-1, 1]."""
+        points = np.asarray(points, dtype=np.float64)
+        total = np.zeros(points.shape[:-1])
+        frequency, amplitude, norm = 1.0, 1.0, 0.0
+        for octave in range(octaves):
+            total += amplitude * self(points * frequency + self.octave_offsets[octave % len(self.octave_offsets)])
+            norm += amplitude
+            frequency *= lacunarity
+            amplitude *= persistence
+        return total / norm
+
+
+@lru_cache(maxsize=32)
+def noise_field(size: int, dims: int = 2, seed: int = 0, octaves: int = 1, extent: float = 1.0,
+                persistence: float = 0.5, lacunarity: float = 2.0) -> np.ndarray:
+    """Cached (size,) * dims fractal noise grid covering ``extent`` noise cells along each axis.
+
+    The returned array is shared between callers and therefore read-only.
+    """
+    axis = np.linspace(0, extent, size, endpoint=False)
+    points = np.stack(np.meshgrid(*(axis,) * dims, indexing="ij"), axis=-1)
+    field = GradientNoise(seed, dims).fractal(points, octaves, persistence, lacunarity)
+    field.flags.writeable = False
+    return field
+
+
+def noise_grid(size: int, density: float, seed: int = 0, octaves: int = 1, extent: float = 4.0) -> np.ndarray:
+    """0/1 uint8 cube whose ``density`` fraction of highest 3D noise values is alive, e.g. to seed an automaton."""
+    field = noise_field(size, 3, seed, octaves, extent)
+    return (field > np.quantile(field, 1 - density)).astype(np.uint8)
@@ -0,0 +1,116 @@
+from functools import lru_cache
+from typing import Iterable, List, Set
+
+import numpy as np
+
+from automata.neighbours import NEIGHBOURHOODS
+
+
+class TransitionTable:
+    """(states, neighbour counts) uint8 table, the next state of a cell being ``table[state, count]``.
+
+    Only cells in ``counted_state`` count as neighbours.
+    """
+
+    def __init__(self, table: np.ndarray, neighbourhood: str = "moore", counted_state: int = 1) -> None:
+        self.table = np.ascontiguousarray(table, dtype=np.uint8)
+        self.flat = self.table.ravel()
+        self.states, self.count_size = self.table.shape
+        self.neighbourhood = neighbourhood
+        self.counted_state = counted_state
+
+    @classmethod
+    def totalistic(cls, birth: Iterable[int], survive: Iterable[int], states: int = 2,
+                   neighbourhood: str = "moore") -> "TransitionTable":
+        """Outer totalistic rule; with more than two states, cells that do not survive decay through the
+        remaining states before dying (Generations rules, e.g. Brian's Brain is ``birth=[2], states=3``)."""
+        count_size = NEIGHBOURHOODS[neighbourhood] + 1
+        birth, survive = set(birth), set(survive)
+        table = np.zeros((states, count_size), dtype=np.uint8)
+        for count in range(count_size):
+            table[0, count] = 1 if count in birth else 0
+            table[1, count] = 1 if count in survive else 2 % states
+        for state in range(2, states):
+            table[state, :] = (state + 1) % states
+        return cls(table, neighbourhood)
+
+    def apply(self, state: np.ndarray, counts: np.ndarray, out: np.ndarray, index: np.ndarray) -> np.ndarray:
+        """Write ``table[state, counts]`` into ``out`` using the integer scratch buffer ``index``."""
+        # uint8 arithmetic would wrap once states * count_size exceeds 255
+        np.multiply(state, self.count_size, out=index, dtype=np.intp)
+        np.add(index, counts, out=index)
+        # indices are in range by construction; the default mode='raise' goes through a temporary copy
+        np.take(self.flat, index, out=out, mode="clip")
+        return out
+
+
+NEIGHBOURHOOD_NAMES = {
+    "M": "moore", "NM": "moore", "MOORE": "moore",
+    "N": "von_neumann", "V": "von_neumann", "VN": "von_neumann", "NN": "von_neumann", "VON_NEUMANN": "von_neumann",
+}
+
+
+@lru_cache(maxsize=None)
+def compile_rule(rule: str, neighbourhood: str = "moore") -> TransitionTable:
+    """Compile a rule string into a cached ``TransitionTable``.
+
+    Accepted notations, counts being comma separated numbers or ``a-b`` ranges:
+     * ``B<counts>/S<counts>[/C<states>][/<N>]`` outer totalistic (or Generations with ``C``),
+       e.g. ``"B14-19/S13-26"``;
+     * ``<survive>/<birth>[/<states>][/<N>]`` Generations, e.g. ``"/2/3"`` for Brian's Brain or
+       ``"4/4/5/M"``.
+    ``<N>`` selects the neighbourhood (``M`` Moore, ``N`` or ``V`` von Neumann) and overrides ``neighbourhood``.
+    """
+    parts = [part.strip() for part in rule.strip().split("/")]
+    if parts and parts[-1].upper() in NEIGHBOURHOOD_NAMES:
+        neighbourhood = NEIGHBOURHOOD_NAMES[parts.pop().upper()]
+    if neighbourhood not in NEIGHBOURHOODS:
+        raise ValueError(f"Unknown neighbourhood {neighbourhood!r}, expected one of {list(NEIGHBOURHOODS)}")
+    max_count = NEIGHBOURHOODS[neighbourhood]
+
+    birth, survive, states = set(), set(), 2
+    if any(part[:1].upper() in ("B", "S") for part in parts):
+        for part in parts:
+            key, value = part[:1].upper(), part[1:]
+            if key == "B":
+                birth = _parse_counts(value, max_count, rule)
+            elif key == "S":
+                survive = _parse_counts(value, max_count, rule)
+            elif key in ("C", "G"):
+                states = _parse_states(value, rule)
+            elif part:
+                raise ValueError(f"Unexpected {part!r} in rule {rule!r}")
+    else:
+        if len(parts) not in (2, 3):
+            raise ValueError(f"Rule {rule!r} is neither B/S nor S/B/C notation")
+        survive = _parse_counts(parts[0], max_count, rule)
+        birth = _parse_counts(parts[1], max_count, rule)
+        if len(parts) == 3:
+            states = _parse_states(parts[2], rule)
+    return TransitionTable.totalistic(sorted(birth), sorted(survive), states, neighbourhood)
+
+
+def _parse_counts(text: str, max_count: int, rule: str) -> Set[int]:
+    counts: List[int] = []
+    for item in filter(None, (item.strip() for item in text.split(","))):
+        try:
+            if "-" in item:
+                low, high = (int(bound) for bound in item.split("-"))
+                counts.extend(range(low, high + 1))
+            else:
+                counts.append(int(item))
+        except ValueError:
+            raise ValueError(f"Invalid neighbour count {item!r} in rule {rule!r}") from None
+    if any(count < 0 or count > max_count for count in counts):
+        raise ValueError(f"Neighbour counts of rule {rule!r} must lie in [0, {max_count}]")
+    return set(counts)
+
+
+def _parse_states(text: str, rule: str) -> int:
+    try:
+        states = int(text)
+    except ValueError:
+        raise ValueError(f"Invalid state count {text!r} in rule {rule!r}") from None
+    if not 2 <= states <= 255:
+        raise ValueError(f"State count of rule {rule!r} must lie in [2, 255]")
+    return states
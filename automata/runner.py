@@ -0,0 +1,29 @@
+from typing import Iterator, Tuple, Union
+
+import numpy as np
+
+
+def run(automaton, generations: int, every: int = 1) -> Iterator[Tuple[int, np.ndarray]]:
+    """Advance ``automaton`` ``generations`` times, yielding ``(generation, state)`` every ``every`` steps.
+
+    Works with any engine exposing ``step(n)``, ``state`` and ``generation``; the yielded state may be
+    overwritten by the next step, so copy it to keep it.
+    """
+    yield automaton.generation, automaton.state
+    done = 0
+    while done < generations:
+        n = min(every, generations - done)
+        automaton.step(n)
+        done += n
+        yield automaton.generation, automaton.state
+
+
+def random_grid(size: Union[int, tuple], density: float, seed: int = None, states: int = 2) -> np.ndarray:
+    """Cubic grid of side ``size`` (or of shape ``size``) whose cells are live with probability ``density``,
+    live cells taking a uniform state in ``1 .. states - 1``."""
+    rng = np.random.default_rng(seed)
+    shape = (size,) * 3 if np.isscalar(size) else tuple(size)
+    grid = (rng.random(shape) < density).astype(np.uint8)
+    if states > 2:
+        grid[grid == 1] = rng.integers(1, states, int(np.count_nonzero(grid)), dtype=np.uint8)
+    return grid
@@ -0,0 +1,44 @@
+import argparse
+import sys
+
+from benchmarks.suite import CASES, DENSITIES, SIZES, compare, load_baseline, run_suite, save_baseline
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks",
+                                     description="Time the simulation and scene pipeline without a window")
+    parser.add_argument("cases", nargs="*", metavar="case", help=f"cases to run (default all): {', '.join(CASES)}")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--densities", type=float, nargs="+", default=list(DENSITIES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", metavar="PATH", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="flag regressions against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="relative slowdown or memory growth reported as a regression")
+    args = parser.parse_args()
+    unknown = [name for name in args.cases if name not in CASES]
+    if unknown:
+        parser.error(f"unknown cases {', '.join(unknown)}")
+    return args
+
+
+def report(key: str, result: dict) -> None:
+    print(f"{key:40s} {result['seconds'] * 1000:10.2f} ms {result['throughput']:12.3g} {result['unit']}/s "
+          f"{result['peak_bytes'] / 2 ** 20:9.1f} MiB peak")
+
+
+def main() -> int:
+    args = parse_args()
+    results = run_suite(args.cases, args.sizes, args.densities, args.repeat, report)
+    if args.save:
+        save_baseline(results, args.save)
+    if args.compare:
+        regressions = compare(results, load_baseline(args.compare), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+import json
+import platform
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from automata.automaton import CellularAutomaton
+from automata.rules import compile_rule
+from automata.runner import random_grid
+from render.graphics import CpuGraphicsEngine
+from render.scene import Scene
+
+SIZES = (32, 64, 128, 256, 512)
+DENSITIES = (0.1, 0.3, 0.5)
+RULES = {"conway": "B14-19/S13-26", "brians_brain": "/2/3"}
+TEXTURES = {1: "gray_bordure.png", 2: "wave.png"}
+
+
+class Case:
+    """One measured operation: ``prepare(size, density)`` builds its input outside the timing, ``run(input)``
+    is timed and returns how many ``unit`` it processed."""
+
+    def __init__(self, name: str, unit: str, prepare: Callable[[int, float], object],
+                 run: Callable[[object], int]) -> None:
+        self.name = name
+        self.unit = unit
+        self.prepare = prepare
+        self.run = run
+
+
+def _step_case(name: str, rule: str) -> Case:
+    table = compile_rule(rule)
+
+    def prepare(size: int, density: float) -> CellularAutomaton:
+        return CellularAutomaton(random_grid(size, density, seed=0, states=table.states), table)
+
+    def run(automaton: CellularAutomaton) -> int:
+        automaton.step()
+        return automaton.state.size
+
+    return Case(f"step/{name}", "cells", prepare, run)
+
+
+def _cubes_prepare(size: int, density: float) -> np.ndarray:
+    return random_grid(size, density, seed=0) == 1
+
+
+def _cubes_run(alive: np.ndarray) -> int:
+    scene = Scene()
+    scene.add_cubes_from_mask(alive, texture_name=TEXTURES[1], cull_hidden=True)
+    return len(scene.cubes)
+
+
+def _instances_case(lattice: bool) -> Case:
+    def prepare(size: int, density: float) -> Tuple[CpuGraphicsEngine, Scene]:
+        scene = Scene()
+        grid = random_grid(size, density, seed=0, states=3)
+        scene.add_cubes_from_mask(grid, textures=TEXTURES, cull_hidden=True)
+        return CpuGraphicsEngine(lattice=lattice), scene
+
+    def run(prepared: Tuple[CpuGraphicsEngine, Scene]) -> int:
+        engine, scene = prepared
+        engine.update_instance_buffer(scene.cubes)
+        engine.prepare_instance_data()
+        return len(scene.cubes)
+
+    return Case("instances/lattice" if lattice else "instances/matrices", "instances", prepare, run)
+
+
+def _chunks_prepare(size: int, density: float) -> Tuple[CpuGraphicsEngine, np.ndarray]:
+    return CpuGraphicsEngine(lattice=True), random_grid(size, density, seed=0)
+
+
+def _chunks_run(prepared: Tuple[CpuGraphicsEngine, np.ndarray]) -> int:
+    engine, grid = prepared
+    # a fresh ChunkedGrid each run, so every chunk is rebuilt
+    engine.chunked_grid = None
+    updates = engine.build_chunk_updates(grid, {1: TEXTURES[1]})
+    return sum(len(data) for levels in updates.values() for groups in levels for data, _ in groups.values())
+
+
+CASES = {case.name: case for case in [
+    *(_step_case(name, rule) for name, rule in RULES.items()),
+    Case("cubes/from_mask", "instances", _cubes_prepare, _cubes_run),
+    _instances_case(lattice=False),
+    _instances_case(lattice=True),
+    Case("chunks/build", "instances", _chunks_prepare, _chunks_run),
+]}
+
+
+def measure(case: Case, size: int, density: float, repeat: int = 3) -> Dict[str, float]:
+    """Best wall time over ``repeat`` runs and the peak memory traced over one more run."""
+    prepared = case.prepare(size, density)
+    times, processed = [], 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        processed = case.run(prepared)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    case.run(prepared)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    seconds = min(times)
+    return {"seconds": seconds, "processed": processed, "unit": case.unit,
+            "throughput": processed / seconds if seconds > 0 else float("inf"), "peak_bytes": peak}
+
+
+def run_suite(names: Iterable[str] = None, sizes: Iterable[int] = SIZES, densities: Iterable[float] = DENSITIES,
+              repeat: int = 3, report: Callable[[str, Dict[str, float]], None] = None) -> Dict[str, dict]:
+    """Measure every case over every size and density, results being keyed ``case/size/density``."""
+    results = {}
+    for name in names or CASES:
+        case = CASES[name]
+        for size in sizes:
+            for density in densities:
+                key = f"{name}/{size}/{density}"
+                results[key] = measure(case, size, density, repeat)
+                if report is not None:
+                    report(key, results[key])
+    return results
+
+
+def save_baseline(results: Dict[str, dict], path: str) -> None:
+    meta = {"python": platform.python_version(), "numpy": np.__version__, "machine": platform.machine(),
+            "processor": platform.processor(), "created": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    with open(path, "w") as file:
+        json.dump({"meta": meta, "results": results}, file, indent=2)
+
+
+def load_baseline(path: str) -> Dict[str, dict]:
+    with open(path) as file:
+        return json.load(file)["results"]
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float = 0.1) -> List[str]:
+    """Describe every result whose throughput dropped, or whose peak memory grew, by more than ``threshold``."""
+    regressions = []
+    for key, result in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        if result["throughput"] < reference["throughput"] * (1 - threshold):
+            regressions.append(f"{key}: throughput {result['throughput']:.3g} {result['unit']}/s, "
+                               f"baseline {reference['throughput']:.3g}")
+        if result["peak_bytes"] > reference["peak_bytes"] * (1 + threshold):
+            regressions.append(f"{key}: peak memory {result['peak_bytes'] / 2 ** 20:.1f} MiB, "
+                               f"baseline {reference['peak_bytes'] / 2 ** 20:.1f} MiB")
+    return regressions
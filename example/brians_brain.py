@@ -2,15 +2,21 @@ from render.render import BaseApp
 from render.utils import WindowSize
 
 import numpy as np
-from scipy.ndimage import convolve
 import glfw.GLFW as GLFW_CONSTANTS
 
+from automata.automaton import CellularAutomaton
+from automata.rules import compile_rule
+
 
 class BriansBrainGame(BaseApp):
-    def __init__(self, seed: int = None) -> None:
-        super().__init__()
+    def __init__(self, seed: int = None, greedy_meshing: bool = False, chunked: bool = True,
+                 volume: bool = False) -> None:
+        super().__init__(texture_array=True, lattice=True)
         self.matrix = None
         self.seed = seed
+        self.greedy_meshing = greedy_meshing
+        self.chunked = chunked
+        self.volume = volume
         self.set_window_title("Brian's Brain")
         self.set_window_size(WindowSize(800, 600))
         self.add_event_key_callback(self.step, GLFW_CONSTANTS.GLFW_KEY_T)
@@ -18,43 +24,38 @@ class BriansBrainGame(BaseApp):
         self.need_to_generate = True
 
         self.matrix_size = 50  # Adjust size as needed
+        # Off cells with two On neighbours turn On, On cells start Dying, Dying cells turn Off
+        self.rule = compile_rule("/2/3")
+        self.automaton = None
         self.reset()
 
     def update(self) -> None:
         if self.need_to_generate:
-            self.scene.delete_all_cubes()
-            self.create_cubes()
-            self.renderer.update_instance_buffer(self.scene.cubes)
-            self.renderer.prepare_instance_data()
+            if self.volume:
+                # The grid is uploaded as a 3D texture and ray-marched, whatever its population
+                self.renderer.update_volume(self.matrix, {1: "gray.png", 2: "wave.png"})
+            elif self.greedy_meshing:
+                self.renderer.update_voxel_mesh(self.matrix, {1: "gray.png", 2: "wave.png"})
+            elif self.chunked:
+                # Only the chunks touched by the last step are rebuilt and uploaded
+                self.renderer.update_chunked_grid(self.matrix, {1: "gray.png", 2: "wave.png"})
+            else:
+                self.scene.delete_all_cubes()
+                self.create_cubes()
+                self.renderer.update_instance_buffer(self.scene.cubes)
+                self.renderer.prepare_instance_data()
             self.need_to_generate = False
 
     def create_cubes(self):
-        for x in range(self.matrix_size):
-            for y in range(self.matrix_size):
-                for z in range(self.matrix_size):
-                    state = self.matrix[x, y, z]
-                    if state == 1:  # On
-                        texture_name = "gray.png"  # Ensure this texture exists
-                    elif state == 2:  # Dying
-                        texture_name = "wave.png"  # Ensure this texture exists
-                    else:
-                        continue  # Skip Off cells
-                    self.scene.add_cube(x, y, z, texture_name=texture_name)
+        # On cells use gray.png, dying cells wave.png, off cells are skipped
+        self.scene.add_cubes_from_mask(self.matrix, textures={1: "gray.png", 2: "wave.png"}, cull_hidden=True)
 
     def reset(self):
-        self.matrix = np.random.choice([0, 1], size=(self.matrix_size, self.matrix_size, self.matrix_size), p=[0.8, 0.2])
+        matrix = np.random.choice([0, 1], size=(self.matrix_size, self.matrix_size, self.matrix_size), p=[0.8, 0.2])
+        self.automaton = CellularAutomaton(matrix, self.rule)
+        self.matrix = self.automaton.state
         self.need_to_generate = True
 
     def step(self):
-        kernel = np.ones((3, 3, 3), dtype=int)
-        kernel[1, 1, 1] = 0
-        neighbor_count = convolve((self.matrix == 1).astype(int), kernel, mode='constant', cval=0)
-
-        new_matrix = np.zeros_like(self.matrix)
-
-        new_matrix[self.matrix == 1] = 2
-        new_matrix[self.matrix == 2] = 0
-        new_matrix[(self.matrix == 0) & (neighbor_count == 2)] = 1
-
-        self.matrix = new_matrix
-        self.need_to_generate = True
\ No newline at end of file
+        self.matrix = self.automaton.step()
+        self.need_to_generate = True
@@ -1,6 +1,7 @@
 import numpy as np
-from scipy.ndimage import convolve
 
+from automata.automaton import CellularAutomaton
+from automata.rules import compile_rule
 from render.render import BaseApp
 from render.utils import WindowSize
 
@@ -8,10 +9,17 @@ import glfw.GLFW as GLFW_CONSTANTS
 
 
 class ConwayGame(BaseApp):
-    def __init__(self, seed: int = None) -> None:
-        super().__init__()
+    def __init__(self, seed: int = None, greedy_meshing: bool = False, chunked: bool = True,
+                 asynchronous: bool = False, steps_per_second: float = None, history: str = None,
+                 volume: bool = False) -> None:
+        if asynchronous and (volume or greedy_meshing):
+            raise ValueError("asynchronous simulation only supports chunked rendering, not volume or greedy_meshing")
+        super().__init__(lattice=True)
         self.matrix = None
         self.seed = seed
+        self.greedy_meshing = greedy_meshing
+        self.chunked = chunked
+        self.volume = volume
         self.set_window_title("Conway's Game of Life")
         self.set_window_size(WindowSize(1000, 800))
         self.add_event_key_callback(self.step, GLFW_CONSTANTS.GLFW_KEY_T)
@@ -19,36 +27,86 @@ class ConwayGame(BaseApp):
         self.need_to_generate = True
 
         self.matrix_size = 10
-        self.nb_birth = list(range(14, 20))
-        self.nb_survive = list(range(13, 27))
+        self.textures = {1: "gray_bordure.png"}
+        self.rule = compile_rule("B14-19/S13-26")
+        self.automaton = None
+        self.history_state = None
+        if history is not None:
+            # Every generation is saved to this file and can be scrubbed with the arrow keys
+            self.record_history(history, (self.matrix_size,) * 3)
         self.reset()
 
+        if asynchronous:
+            # Generations run in the background and T pauses/resumes them
+            self.start_simulation(self._advance, self._prepare_chunks, rate=steps_per_second,
+                                  merge=lambda older, newer: {**older, **newer})
+            self.add_event_key_callback(self.simulation.toggle, GLFW_CONSTANTS.GLFW_KEY_T)
+
     def update(self) -> None:
         if self.need_to_generate:
-            self.scene.delete_all_cubes()
-            self.create_cube()
-            self.renderer.update_instance_buffer(self.scene.cubes)
-            self.renderer.prepare_instance_data()  # Assurez-vous d'appeler cette méthode
+            state = self.matrix if self.history_state is None else self.history_state
+            if self.simulation is not None:
+                with self.simulation.lock:
+                    # A frame still waiting holds older updates, apply them first so they can't overwrite these
+                    self._consume_simulation_frame()
+                    self.renderer.update_chunked_grid(state, self.textures)
+            elif self.volume:
+                # The grid is uploaded as a 3D texture and ray-marched, whatever its population
+                self.renderer.update_volume(state, self.textures)
+            elif self.greedy_meshing:
+                self.renderer.update_voxel_mesh(state, self.textures)
+            elif self.chunked:
+                # Only the chunks touched by the last step are rebuilt and uploaded
+                self.renderer.update_chunked_grid(state, self.textures)
+            else:
+                self.scene.delete_all_cubes()
+                self.create_cube()
+                self.renderer.update_instance_buffer(self.scene.cubes)
+                self.renderer.prepare_instance_data()  # Assurez-vous d'appeler cette méthode
             self.need_to_generate = False
 
     def create_cube(self):
-        for x in range(self.matrix_size):
-            for y in range(self.matrix_size):
-                for z in range(self.matrix_size):
-                    if self.matrix[x, y, z] == 1:
-                        texture_name = "gray_bordure.png"
-                        self.scene.add_cube(x, y, z, texture_name=texture_name)
+        state = self.matrix if self.history_state is None else self.history_state
+        self.scene.add_cubes_from_mask(state == 1, texture_name="gray_bordure.png", cull_hidden=True)
 
     def reset(self):
-        self.matrix = np.random.choice([0, 1], (self.matrix_size, self.matrix_size, self.matrix_size), p=[0.5, 0.5])
+        matrix = np.random.choice([0, 1], (self.matrix_size, self.matrix_size, self.matrix_size), p=[0.5, 0.5])
+        if self.simulation is not None:
+            with self.simulation.lock:
+                self.automaton = CellularAutomaton(matrix, self.rule)
+                self.matrix = self.automaton.state
+        else:
+            self.automaton = CellularAutomaton(matrix, self.rule)
+            self.matrix = self.automaton.state
+        self.record_generation(self.matrix, keyframe=True)
         self.need_to_generate = True
 
     def step(self):
-        kernel = np.ones((3, 3, 3), dtype=int)
-        kernel[1, 1, 1] = 0
-        neighbor_count = convolve(self.matrix, kernel, mode='constant', cval=0)
-        birth = (self.matrix == 0) & np.isin(neighbor_count, self.nb_birth)
-        survive = (self.matrix == 1) & np.isin(neighbor_count, self.nb_survive)
-        self.matrix[...] = 0
-        self.matrix[birth | survive] = 1
+        self.matrix = self.automaton.step()
+        self.record_generation(self.matrix)
+        self.need_to_generate = True
+
+    def on_history_frame(self, generation, state) -> None:
+        if state is None and self.simulation is not None:
+            # Back to live: updates built while scrubbing are relative to the shown generation, start over
+            with self.simulation.lock:
+                self.renderer.chunked_grid = None
+        self.history_state = state
         self.need_to_generate = True
+
+    def on_simulation_frame(self, frame) -> None:
+        if self.history_state is not None:
+            # The shown chunks belong to an older generation: drop the update and rebuild everything
+            with self.simulation.lock:
+                self.renderer.chunked_grid = None
+            self.need_to_generate = True
+            return
+        self.renderer.apply_chunk_updates(frame)
+
+    def _advance(self) -> np.ndarray:
+        self.matrix = self.automaton.step()
+        self.record_generation(self.matrix)
+        return self.matrix
+
+    def _prepare_chunks(self, state: np.ndarray) -> dict:
+        return self.renderer.build_chunk_updates(state, self.textures)
@@ -1,7 +1,7 @@
 import numpy as np
-from perlin_noise import PerlinNoise
 import glfw.GLFW as GLFW_CONSTANTS
 
+from automata.noise import noise_field
 from render.render import BaseApp
 from render.utils import WindowSize
 
@@ -13,8 +13,10 @@ class PerlinNoiseVisualisation(BaseApp): # Inherit from BaseApp (3D visualisatio
         self.set_window_title("PerlinNoise") # Set window title
         self.set_window_size(WindowSize(1000, 800)) # Set window size
         self.matrix_size = 50 # Size of the matrix
+        self.seed = 0
         self.need_to_generate = True
         self.add_event_key_callback(self.regenerate_matrix, GLFW_CONSTANTS.GLFW_KEY_R) # Add key callback
+        self.add_event_key_callback(self.previous_matrix, GLFW_CONSTANTS.GLFW_KEY_E) # Fields are cached, going back is instant
 
     def update(self) -> None:
         if self.need_to_generate:
@@ -25,6 +27,14 @@ class PerlinNoiseVisualisation(BaseApp): # Inherit from BaseApp (3D visualisatio
             self.need_to_generate = False
 
     def regenerate_matrix(self) -> None:
+        self._show_seed(self.seed + 1)
+
+    def previous_matrix(self) -> None:
+        if self.seed > 0:
+            self._show_seed(self.seed - 1)
+
+    def _show_seed(self, seed: int) -> None:
+        self.seed = seed
         self.scene.delete_all_cubes()
         self.noise_map = self.generate_noise_map()
         self.create_cube_from_noise_map()
@@ -32,18 +42,12 @@ class PerlinNoiseVisualisation(BaseApp): # Inherit from BaseApp (3D visualisatio
         self.renderer.prepare_instance_data()
 
     def generate_noise_map(self) -> np.ndarray:
-        noise = PerlinNoise(octaves=2.3)
-        lin = np.linspace(0, 1, self.matrix_size, endpoint=False)
-        x, y = np.meshgrid(lin, lin)
-        pic = np.zeros((self.matrix_size, self.matrix_size))
-        for i in range(self.matrix_size):
-            for j in range(self.matrix_size):
-                pic[i][j] = noise([x[i][j], y[i][j]])
-        return pic
+        # 2.3 noise cells across the map, halved to [-0.5, 0.5]
+        return noise_field(self.matrix_size, dims=2, seed=self.seed, extent=2.3) / 2
 
     def create_cube_from_noise_map(self) -> None:
-        for i in range(self.matrix_size):
-            for j in range(self.matrix_size):
-               # Add cube to the scene
-                self.scene.add_cube(i, j, self.noise_map[i, j] * self.matrix_size,texture_name="pastel.png")
+        i, j = np.indices(self.noise_map.shape)
+        heights = self.noise_map * self.matrix_size
+        positions = np.column_stack((i.ravel(), j.ravel(), heights.ravel())) # One cube per column of the map
+        self.scene.add_cubes_from_positions(positions, texture_name="pastel.png")
 
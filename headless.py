@@ -0,0 +1,67 @@
+import argparse
+import os
+import sys
+import time
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run (and optionally render) a cellular automaton without a window")
+    parser.add_argument("rule", help='rule string, e.g. "B14-19/S13-26" or "/2/3"')
+    parser.add_argument("--size", type=int, default=64)
+    parser.add_argument("--density", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--generations", type=int, default=100)
+    parser.add_argument("--boundary", choices=("constant", "periodic"), default="constant")
+    parser.add_argument("--every", type=int, default=1, help="render or save every N generations")
+    parser.add_argument("--snapshots", help="directory receiving one .npy state per saved generation")
+    parser.add_argument("--frames", help="directory receiving a PNG sequence, or - for raw RGBA on stdout")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--platform", choices=("egl", "osmesa"), default="egl")
+    parser.add_argument("--volume", action="store_true", help="ray-march the grid as a 3D texture instead of cubes")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    # must be set before anything imports OpenGL
+    os.environ.setdefault("PYOPENGL_PLATFORM", args.platform)
+
+    from automata.automaton import CellularAutomaton
+    from automata.rules import compile_rule
+    from automata.runner import random_grid, run
+
+    rule = compile_rule(args.rule)
+    automaton = CellularAutomaton(random_grid(args.size, args.density, args.seed), rule, boundary=args.boundary)
+    states = (state for _, state in run(automaton, args.generations, args.every))
+    start = time.perf_counter()
+
+    if args.frames:
+        from render.offscreen import (OffscreenRenderer, PngSequenceWriter, RawStreamWriter, orbit_camera,
+                                      render_generations)
+        from render.utils import WindowSize
+
+        offscreen = OffscreenRenderer(WindowSize(args.width, args.height), lattice=True)
+        writer = RawStreamWriter(sys.stdout.buffer) if args.frames == "-" else PngSequenceWriter(args.frames)
+        center = (args.size / 2,) * 3
+        camera = orbit_camera(center, radius=1.5 * args.size, height=0.6 * args.size, frames_per_turn=360)
+        textures = {state: "gray_bordure.png" if state == 1 else "wave.png" for state in range(1, rule.states)}
+        count = render_generations(offscreen, states, textures, writer, camera, volume=args.volume)
+        offscreen.quit()
+        print(f"{count} frames written in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+        return
+
+    import numpy as np
+
+    if args.snapshots:
+        os.makedirs(args.snapshots, exist_ok=True)
+    for state in states:
+        if args.snapshots:
+            np.save(os.path.join(args.snapshots, f"generation_{automaton.generation:06d}.npy"), state)
+    elapsed = time.perf_counter() - start
+    print(f"{args.generations} generations of {args.size}^3 in {elapsed:.2f}s "
+          f"({args.generations / max(elapsed, 1e-9):.1f} steps/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import hashlib
+import os
+from typing import List, Tuple
+
+import numpy as np
+from OpenGL.GL import *
+from OpenGL.GL.shaders import compileShader
+
+from render.config import CACHE_DIR
+
+
+def _file_key(*parts) -> str:
+    """Digest of ``parts``, files among them standing for their absolute path, mtime and size."""
+    digest = hashlib.sha1()
+    for part in parts:
+        if isinstance(part, str) and os.path.isfile(part):
+            stat = os.stat(part)
+            part = (os.path.abspath(part), stat.st_mtime_ns, stat.st_size)
+        digest.update(repr(part).encode())
+    return digest.hexdigest()
+
+
+def _write_atomic(path: str, write) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as file:
+        write(file)
+    os.replace(temporary, path)
+
+
+def load_rgba(filepath: str, size: Tuple[int, int] = None) -> np.ndarray:
+    """Decoded (height, width, 4) uint8 pixels of an image, resized to ``size`` (width, height) if given.
+
+    Decoded images are kept in ``CACHE_DIR`` as .npy files keyed by path, mtime and size, and later loads
+    memory-map them instead of decoding again; PIL is only imported on a miss.
+    """
+    path = os.path.join(CACHE_DIR, "textures", f"{_file_key(filepath, size)}.npy")
+    try:
+        return np.load(path, mmap_mode="r")
+    except (OSError, ValueError):
+        pass
+
+    from PIL import Image
+
+    with Image.open(filepath, mode="r") as image:
+        image = image.convert("RGBA")
+        if size is not None and image.size != tuple(size):
+            image = image.resize(size)
+        pixels = np.asarray(image, dtype=np.uint8)
+    try:
+        _write_atomic(path, lambda file: np.save(file, pixels))
+    except OSError:
+        pass
+    return pixels
+
+
+def load_program(shaders: List[Tuple[str, int]]) -> int:
+    """Link a program from ``(source path, shader type)`` pairs, reusing its cached binary when possible.
+
+    Binaries are keyed by the sources and the GL vendor, renderer and version; a binary the driver
+    rejects is compiled again from source and replaced.
+    """
+    key = _program_key(shaders, [glGetString(name) for name in (GL_VENDOR, GL_RENDERER, GL_VERSION)])
+    path = os.path.join(CACHE_DIR, "programs", f"{key}.bin")
+    cacheable = glGetIntegerv(GL_NUM_PROGRAM_BINARY_FORMATS) > 0
+
+    if cacheable and os.path.isfile(path):
+        program = _program_from_binary(path)
+        if program is not None:
+            return program
+
+    program = glCreateProgram()
+    compiled = []
+    for filepath, shader_type in shaders:
+        with open(filepath, "r") as file:
+            compiled.append(compileShader(file.read(), shader_type))
+        glAttachShader(program, compiled[-1])
+    if cacheable:
+        glProgramParameteri(program, GL_PROGRAM_BINARY_RETRIEVABLE_HINT, GL_TRUE)
+    glLinkProgram(program)
+    for shader in compiled:
+        glDetachShader(program, shader)
+        glDeleteShader(shader)
+    if glGetProgramiv(program, GL_LINK_STATUS) != GL_TRUE:
+        raise RuntimeError(f"Link failure: {glGetProgramInfoLog(program)}")
+
+    if cacheable:
+        try:
+            _save_program_binary(program, path)
+        except OSError:
+            pass
+    return program
+
+
+def _program_key(shaders: List[Tuple[str, int]], driver: List[bytes]) -> str:
+    # paths go in as bare strings so that _file_key adds their mtime and size
+    return _file_key(*(filepath for filepath, _ in shaders), *(int(shader_type) for _, shader_type in shaders),
+                     *driver)
+
+
+def _program_from_binary(path: str) -> int:
+    with open(path, "rb") as file:
+        data = file.read()
+    binary_format = int.from_bytes(data[:4], "little")
+    program = glCreateProgram()
+    try:
+        glProgramBinary(program, binary_format, data[4:], len(data) - 4)
+        linked = glGetProgramiv(program, GL_LINK_STATUS) == GL_TRUE
+    except GLError:
+        linked = False
+    if not linked:
+        # driver updated or binary from another GPU
+        glDeleteProgram(program)
+        return None
+    return program
+
+
+def _save_program_binary(program: int, path: str) -> None:
+    length = glGetProgramiv(program, GL_PROGRAM_BINARY_LENGTH)
+    binary = np.empty(length, dtype=np.uint8)
+    written = GLsizei(0)
+    binary_format = GLenum(0)
+    glGetProgramBinary(program, length, written, binary_format, binary)
+    _write_atomic(path, lambda file: (file.write(int(binary_format.value).to_bytes(4, "little")),
+                                      file.write(binary[:written.value].tobytes())))
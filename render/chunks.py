@@ -0,0 +1,96 @@
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+from render.config import CHUNK_SIZE
+from render.voxels import exposed_mask
+
+Chunk = Tuple[int, int, int]
+
+
+class ChunkedGrid:
+    """Tracks which ``chunk_size``³ chunks of a state grid changed between two updates.
+
+    With ``cull_hidden`` a change also dirties the chunks holding its six neighbours, since it can hide
+    or expose cells across a chunk boundary.
+    """
+
+    def __init__(self, chunk_size: int = CHUNK_SIZE, cull_hidden: bool = True) -> None:
+        self.chunk_size = chunk_size
+        self.cull_hidden = cull_hidden
+        self.previous: np.ndarray = None
+
+    @property
+    def chunk_counts(self) -> Tuple[int, int, int]:
+        return tuple(-(-size // self.chunk_size) for size in self.previous.shape)
+
+    def update(self, grid: np.ndarray, changed: np.ndarray = None) -> List[Chunk]:
+        """Remember ``grid`` and return the chunks to rebuild; ``changed`` may give the changed cells directly."""
+        grid = np.asarray(grid)
+        if self.previous is None or self.previous.shape != grid.shape:
+            self.previous = grid.copy()
+            return [tuple(chunk) for chunk in np.ndindex(*self.chunk_counts)]
+
+        if changed is None:
+            changed = self.previous != grid
+        if self.cull_hidden:
+            changed = _dilate(changed)
+        self.previous[...] = grid
+
+        dirty = changed
+        for axis, size in enumerate(grid.shape):
+            starts = np.arange(0, size, self.chunk_size)
+            dirty = np.logical_or.reduceat(dirty, starts, axis=axis)
+        return [tuple(chunk) for chunk in np.argwhere(dirty).tolist()]
+
+    def bounds(self, chunk: Chunk) -> Tuple[np.ndarray, np.ndarray]:
+        low = np.asarray(chunk) * self.chunk_size
+        high = np.minimum(low + self.chunk_size, self.previous.shape)
+        return low, high
+
+    def chunk_cells(self, grid: np.ndarray, chunk: Chunk, states: Iterable[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """Positions (N, 3) and states (N,) of the drawn cells of one chunk."""
+        low, high = self.bounds(chunk)
+        return region_cells(grid, low, high, states, self.cull_hidden)
+
+    def neighbours(self, chunks: List[Chunk]) -> List[Chunk]:
+        """``chunks`` and the chunks sharing a face with them."""
+        counts = self.chunk_counts
+        found = set(chunks)
+        for chunk in chunks:
+            for axis in range(3):
+                for direction in (-1, 1):
+                    neighbour = list(chunk)
+                    neighbour[axis] += direction
+                    if 0 <= neighbour[axis] < counts[axis]:
+                        found.add(tuple(neighbour))
+        return sorted(found)
+
+
+def region_cells(grid: np.ndarray, low: np.ndarray, high: np.ndarray, states: Iterable[int],
+                 cull_hidden: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    """Positions (N, 3) and states (N,) of the drawn cells of ``grid[low:high]``, looking one cell past it
+    to drop the hidden ones."""
+    halo_low = np.maximum(low - 1, 0) if cull_hidden else low
+    halo_high = np.minimum(high + 1, grid.shape) if cull_hidden else high
+    region = grid[halo_low[0]:halo_high[0], halo_low[1]:halo_high[1], halo_low[2]:halo_high[2]]
+    drawn = np.isin(region, list(states))
+    if cull_hidden:
+        drawn = exposed_mask(drawn)
+
+    inner = tuple(slice(lo, hi) for lo, hi in zip(low - halo_low, high - halo_low))
+    drawn = drawn[inner]
+    indices = np.nonzero(drawn)
+    positions = (np.column_stack(indices) + low).astype(np.float32)
+    return positions, region[inner][indices]
+
+
+def _dilate(mask: np.ndarray) -> np.ndarray:
+    dilated = mask.copy()
+    dilated[1:] |= mask[:-1]
+    dilated[:-1] |= mask[1:]
+    dilated[:, 1:] |= mask[:, :-1]
+    dilated[:, :-1] |= mask[:, 1:]
+    dilated[:, :, 1:] |= mask[:, :, :-1]
+    dilated[:, :, :-1] |= mask[:, :, 1:]
+    return dilated
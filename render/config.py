@@ -3,4 +3,8 @@
 PLAYER_SPEED = 30
 NEAR = 0.1
 FAR = 1000
-FOV = 90
\ No newline at end of file
+FOV = 90
+CHUNK_SIZE = 16
+LOD_DISTANCE = 64
+LOD_LEVELS = 3
+CACHE_DIR = ".cache"
@@ -1,9 +1,83 @@
+from typing import Dict, Iterator, List
+
 from render.utils import Position
 
 import numpy as np
 
+DEFAULT_TEXTURE = "default_texture.png"
+
+
 class Cube:
     def __init__(self, position: Position, eulers: Position = (0, 0, 0), texture_name: str = None) -> None:
         self.position: np.ndarray = np.array(position, dtype=np.float32)
         self.eulers: np.ndarray = np.array(eulers, dtype=np.float32)
-        self.texture_name = texture_name if texture_name is not None else "default_texture.png"
\ No newline at end of file
+        self.texture_name = texture_name if texture_name is not None else DEFAULT_TEXTURE
+
+
+class CubeArray:
+    """Struct-of-arrays cube storage: contiguous positions, eulers and texture ids with amortized growth."""
+
+    def __init__(self, capacity: int = 0) -> None:
+        self._positions: np.ndarray = np.empty((capacity, 3), dtype=np.float32)
+        self._eulers: np.ndarray = np.empty((capacity, 3), dtype=np.float32)
+        self._texture_ids: np.ndarray = np.empty(capacity, dtype=np.uint16)
+        self.count = 0
+        self.texture_names: List[str] = []
+        self._texture_lookup: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[Cube]:
+        for i in range(self.count):
+            yield Cube(self._positions[i], self._eulers[i], self.texture_names[self._texture_ids[i]])
+
+    @property
+    def positions(self) -> np.ndarray:
+        return self._positions[:self.count]
+
+    @property
+    def eulers(self) -> np.ndarray:
+        return self._eulers[:self.count]
+
+    @property
+    def texture_ids(self) -> np.ndarray:
+        return self._texture_ids[:self.count]
+
+    def texture_id(self, texture_name: str = None) -> int:
+        texture_name = texture_name if texture_name is not None else DEFAULT_TEXTURE
+        if texture_name not in self._texture_lookup:
+            self._texture_lookup[texture_name] = len(self.texture_names)
+            self.texture_names.append(texture_name)
+        return self._texture_lookup[texture_name]
+
+    def append(self, position: Position, eulers: Position = (0, 0, 0), texture_name: str = None) -> None:
+        self._reserve(self.count + 1)
+        self._positions[self.count] = position
+        self._eulers[self.count] = eulers
+        self._texture_ids[self.count] = self.texture_id(texture_name)
+        self.count += 1
+
+    def extend(self, positions: np.ndarray, eulers: np.ndarray = None, texture_ids: np.ndarray | int = 0) -> None:
+        positions = np.asarray(positions, dtype=np.float32).reshape(-1, 3)
+        n = positions.shape[0]
+        start, end = self.count, self.count + n
+        self._reserve(end)
+        self._positions[start:end] = positions
+        self._eulers[start:end] = 0 if eulers is None else eulers
+        self._texture_ids[start:end] = texture_ids
+        self.count = end
+
+    def clear(self) -> None:
+        self.count = 0
+
+    def _reserve(self, count: int) -> None:
+        capacity = self._positions.shape[0]
+        if count <= capacity:
+            return
+        capacity = max(count, 2 * capacity, 64)
+        for name in ("_positions", "_eulers", "_texture_ids"):
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
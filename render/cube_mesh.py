@@ -7,11 +7,11 @@ from OpenGL.GL import *
 class CubeMesh:
     def __init__(self) -> None:
         vertices: Tuple = (-0.5, -0.5, -0.5, 0, 0,
-                           0.5, -0.5, -0.5, 1, 0,
                            0.5, 0.5, -0.5, 1, 1,
+                           0.5, -0.5, -0.5, 1, 0,
                            0.5, 0.5, -0.5, 1, 1,
-                           -0.5, 0.5, -0.5, 0, 1,
                            -0.5, -0.5, -0.5, 0, 0,
+                           -0.5, 0.5, -0.5, 0, 1,
                            -0.5, -0.5, 0.5, 0, 0,
                            0.5, -0.5, 0.5, 1, 0,
                            0.5, 0.5, 0.5, 1, 1,
@@ -25,11 +25,11 @@ class CubeMesh:
                            -0.5, -0.5, 0.5, 0, 0,
                            -0.5, 0.5, 0.5, 1, 0,
                            0.5, 0.5, 0.5, 1, 0,
-                           0.5, 0.5, -0.5, 1, 1,
                            0.5, -0.5, -0.5, 0, 1,
+                           0.5, 0.5, -0.5, 1, 1,
                            0.5, -0.5, -0.5, 0, 1,
-                           0.5, -0.5, 0.5, 0, 0,
                            0.5, 0.5, 0.5, 1, 0,
+                           0.5, -0.5, 0.5, 0, 0,
                            -0.5, -0.5, -0.5, 0, 1,
                            0.5, -0.5, -0.5, 1, 1,
                            0.5, -0.5, 0.5, 1, 0,
@@ -37,41 +37,56 @@ class CubeMesh:
                            -0.5, -0.5, 0.5, 0, 0,
                            -0.5, -0.5, -0.5, 0, 1,
                            -0.5, 0.5, -0.5, 0, 1,
-                           0.5, 0.5, -0.5, 1, 1,
                            0.5, 0.5, 0.5, 1, 0,
+                           0.5, 0.5, -0.5, 1, 1,
                            0.5, 0.5, 0.5, 1, 0,
-                           -0.5, 0.5, 0.5, 0, 0,
-                           -0.5, 0.5, -0.5, 0, 1)
+                           -0.5, 0.5, -0.5, 0, 1,
+                           -0.5, 0.5, 0.5, 0, 0)
 
         self.vertex_count: int = len(vertices) // 5
         self.vertices: np.ndarray = np.array(vertices, dtype=np.float32)
 
-        self.vao = glGenVertexArrays(1)
-        glBindVertexArray(self.vao)
-
         self.vbo = glGenBuffers(1)
         glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
         glBufferData(GL_ARRAY_BUFFER, self.vertices.nbytes, self.vertices, GL_STATIC_DRAW)
 
+    def create_instance_vao(self, instance_vbo: int, layer_vbo: int = None, lattice: bool = False) -> int:
+        vao = glGenVertexArrays(1)
+        glBindVertexArray(vao)
+
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
         glEnableVertexAttribArray(0)
         glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, 20, ctypes.c_void_p(0))
 
         glEnableVertexAttribArray(1)
         glVertexAttribPointer(1, 2, GL_FLOAT, GL_FALSE, 20, ctypes.c_void_p(12))
 
-        self.instanceVBO = glGenBuffers(1)
-        glBindBuffer(GL_ARRAY_BUFFER, self.instanceVBO)
+        self.point_instance_attributes(instance_vbo, layer_vbo, lattice)
+        return vao
+
+    @staticmethod
+    def point_instance_attributes(instance_vbo: int, layer_vbo: int = None, lattice: bool = False,
+                                  first: int = 0) -> None:
+        """Point the instance attributes of the bound VAO at instance ``first`` (GL 3.3 has no base instance)."""
+        glBindBuffer(GL_ARRAY_BUFFER, instance_vbo)
 
-        stride = 64
-        for i in range(4):
-            glEnableVertexAttribArray(2 + i)
-            glVertexAttribPointer(2 + i, 4, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(16 * i))
-            glVertexAttribDivisor(2 + i, 1)
+        if lattice:
+            # int16 (x, y, z, layer) per instance
+            glEnableVertexAttribArray(2)
+            glVertexAttribIPointer(2, 4, GL_SHORT, 8, ctypes.c_void_p(8 * first))
+            glVertexAttribDivisor(2, 1)
+        else:
+            stride = 64
+            for i in range(4):
+                glEnableVertexAttribArray(2 + i)
+                glVertexAttribPointer(2 + i, 4, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(stride * first + 16 * i))
+                glVertexAttribDivisor(2 + i, 1)
 
-    def update_instance_data(self, instance_data: np.ndarray) -> None:
-        glBindBuffer(GL_ARRAY_BUFFER, self.instanceVBO)
-        glBufferData(GL_ARRAY_BUFFER, instance_data.nbytes, instance_data, GL_STATIC_DRAW)
+        if layer_vbo is not None:
+            glBindBuffer(GL_ARRAY_BUFFER, layer_vbo)
+            glEnableVertexAttribArray(6)
+            glVertexAttribIPointer(6, 1, GL_UNSIGNED_SHORT, 2, ctypes.c_void_p(2 * first))
+            glVertexAttribDivisor(6, 1)
 
     def destroy(self) -> None:
-        glDeleteBuffers(1, [self.vbo, self.instanceVBO])
-        glDeleteVertexArrays(1, [self.vao])
\ No newline at end of file
+        glDeleteBuffers(1, [self.vbo])
@@ -0,0 +1,69 @@
+from typing import List, Tuple
+
+import numpy as np
+
+# Half diagonal of a unit cube, so any rotation of it stays inside a chunk's padded bounding box
+CUBE_RADIUS = float(np.sqrt(3) / 2)
+
+
+def chunk_keys(positions: np.ndarray, chunk_size: int) -> np.ndarray:
+    """One int64 key per position identifying its axis-aligned chunk of ``chunk_size`` cells."""
+    chunks = np.floor(np.asarray(positions, dtype=np.float32).reshape(-1, 3) / chunk_size).astype(np.int64)
+    if len(chunks) == 0:
+        return np.empty(0, dtype=np.int64)
+    chunks -= chunks.min(axis=0)
+    dims = chunks.max(axis=0) + 1
+    return (chunks[:, 0] * dims[1] + chunks[:, 1]) * dims[2] + chunks[:, 2]
+
+
+def frustum_planes(view: np.ndarray, projection: np.ndarray) -> np.ndarray:
+    """(6, 4) planes ``a, b, c, d`` of the view frustum, inside where ``a*x + b*y + c*z + d >= 0``.
+
+    Matrices follow pyrr's row-vector convention (``clip = point @ view @ projection``).
+    """
+    combined = np.asarray(view, dtype=np.float64) @ np.asarray(projection, dtype=np.float64)
+    x, y, z, w = combined[:, 0], combined[:, 1], combined[:, 2], combined[:, 3]
+    return np.stack((w + x, w - x, w + y, w - y, w + z, w - z))
+
+
+def boxes_visible(mins: np.ndarray, maxs: np.ndarray, planes: np.ndarray) -> np.ndarray:
+    """Mask of the axis-aligned boxes ``(mins, maxs)`` that intersect the frustum ``planes``."""
+    normals, offsets = planes[:, :3], planes[:, 3]
+    # for each plane the box corner furthest along its normal
+    corners = np.where(normals[None] >= 0, maxs[:, None], mins[:, None])
+    return np.all(np.einsum("cpk,pk->cp", corners, normals) + offsets >= 0, axis=1)
+
+
+class ChunkIndex:
+    """Bounding boxes of runs of instances sorted by chunk key, tested against the view frustum."""
+
+    def __init__(self, positions: np.ndarray, keys: np.ndarray, radius: float = CUBE_RADIUS) -> None:
+        positions = np.asarray(positions, dtype=np.float32).reshape(-1, 3)
+        if len(keys):
+            self.first = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        else:
+            self.first = np.empty(0, dtype=np.intp)
+        self.count = np.diff(np.append(self.first, len(keys)))
+        if len(self.first):
+            self.mins = np.minimum.reduceat(positions, self.first, axis=0) - radius
+            self.maxs = np.maximum.reduceat(positions, self.first, axis=0) + radius
+        else:
+            self.mins = self.maxs = np.empty((0, 3), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.first)
+
+    def visible(self, planes: np.ndarray) -> np.ndarray:
+        return boxes_visible(self.mins, self.maxs, planes)
+
+    def visible_ranges(self, planes: np.ndarray) -> List[Tuple[int, int]]:
+        """Visible instances as ``(first, count)`` ranges, neighbouring visible chunks merged."""
+        chunks = np.flatnonzero(self.visible(planes))
+        if len(chunks) == 0:
+            return []
+        run_start = np.r_[True, np.diff(chunks) != 1]
+        starts = chunks[run_start]
+        ends = chunks[np.append(run_start[1:], True)]
+        firsts = self.first[starts]
+        counts = self.first[ends] + self.count[ends] - firsts
+        return list(zip(firsts.tolist(), counts.tolist()))
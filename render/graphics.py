@@ -1,45 +1,118 @@
-from typing import List
+from typing import Dict, List, Set, Tuple
 
 from OpenGL.GL import *
-from OpenGL.GL.shaders import compileProgram, compileShader, ShaderProgram
 import numpy as np
 import pyrr
 
-from render.cube import Cube
+from render.cache import load_program
+from render.cube import CubeArray
 from render.cube_mesh import CubeMesh
-from render.material import Material
+from render.chunks import Chunk, ChunkedGrid, region_cells
+from render.culling import ChunkIndex, boxes_visible, chunk_keys, frustum_planes
+from render.instance_buffer import InstanceBuffer
+from render.lod import OccupancyPyramid
+from render.material import Material, TextureArrayMaterial
+from render.pacing import FrameScheduler, redraws
+from render.profiler import FrameProfiler, profiled
 from render.scene import Scene
-from render.utils import Color, WindowSize
+from render.stats import FrameStats
+from render.transforms import LatticeCellBuffer, ModelMatrixBuffer, build_lattice_cells, build_model_matrices
+from render.utils import Color, Position, WindowSize
+from render.volume import VolumeGrid
+from render.voxel_mesh import VoxelMesh
+from render.voxels import greedy_mesh
 from render.config import *
 
 class GraphicsEngine:
-    def __init__(self, window_size: WindowSize, clear_color: Color = (0.1, 0.1, 0.2, 1)) -> None:
-        self.instance_data_per_texture = None
-        self.cubes_by_texture = None
+    def __init__(self, window_size: WindowSize, clear_color: Color = (0.1, 0.1, 0.2, 1),
+                 texture_array: bool = False, lattice: bool = False, frustum_culling: bool = True,
+                 lod: bool = False) -> None:
+        self._init_instance_state(texture_array, lattice, frustum_culling, lod)
         self.window_size = window_size
         self.cube_mesh: CubeMesh = CubeMesh()
-        self.wave_texture: Material = Material("textures/gray_bordure.png")
-
-        self.near = NEAR
-        self.far = FAR
-        self.fov = FOV
 
         glClearColor(*clear_color)
-        self.shaders = self._create_shaders("shaders/vertex.txt", "shaders/fragment.txt")
+        vertex_path = "shaders/vertex.txt"
+        fragment_path = "shaders/fragment.txt"
+        if self.texture_array:
+            vertex_path = "shaders/vertex_array.txt"
+            fragment_path = "shaders/fragment_array.txt"
+        if self.lattice:
+            vertex_path = "shaders/vertex_lattice.txt"
+        self.shaders = self._create_shaders(vertex_path, fragment_path)
         glUseProgram(self.shaders)
         glUniform1i(glGetUniformLocation(self.shaders, "imageTexture"), 0)
         glEnable(GL_BLEND)
         glEnable(GL_DEPTH_TEST)
+        glEnable(GL_CULL_FACE)
+        glCullFace(GL_BACK)
+        glFrontFace(GL_CCW)
 
         self.projectionMatrixLocation = glGetUniformLocation(self.shaders, "projection")
+        # Only the lattice shader scales cells, coarse LOD matrices carry their scale
+        self.cellScaleLocation = glGetUniformLocation(self.shaders, "cellScale")
+        glUniform1f(self.cellScaleLocation, 1.0)
 
         self._update_projection_matrix(window_size.width, window_size.height)
 
         self.viewMatrixLocation = glGetUniformLocation(self.shaders, "view")
 
+    def _init_instance_state(self, texture_array: bool, lattice: bool, frustum_culling: bool, lod: bool) -> None:
+        """Everything the engine holds besides GL objects, so the CPU side can run without a context."""
+        # Set by BaseApp so that changes to what is drawn request a frame
+        self.scheduler: FrameScheduler = None
+        self.profiler: FrameProfiler = None
+        self.texture_array = texture_array
+        self.lattice = lattice
+        self.frustum_culling = frustum_culling
+        self.chunk_size = CHUNK_SIZE
+        self.lod = lod
+        self.lod_distance = LOD_DISTANCE
+        self.lod_levels = LOD_LEVELS
+        self.pyramid: OccupancyPyramid = None
+        self.chunks_by_texture = {}
+        self.projection_transform = None
+        self.instance_data_per_texture = None
+        self.cubes_by_texture = None
+        self.instance_positions = None
+        self.instance_eulers = None
+        self.instance_layers = None
+        self.layer_texture_names = []
+        self.instance_data = None
         self.instance_count = 0
+        self.instance_data_dirty = False
+        self.model_matrices = ModelMatrixBuffer()
+        self.lattice_cells = LatticeCellBuffer()
+        self.stats = FrameStats()
+
+        self.near = NEAR
+        self.far = FAR
+        self.fov = FOV
 
         self.textures = {}
+        self.instance_buffers: Dict[str, InstanceBuffer] = {}
+        self.layered_instance_buffer: InstanceBuffer = None
+        self.texture_array_material: TextureArrayMaterial = None
+        self.texture_array_names = []
+
+        self.voxel_mesh: VoxelMesh = None
+        self.mesh_shaders = None
+        self.voxel_vertices = None
+        self.voxel_ranges = None
+        self.voxel_mesh_dirty = False
+        self.volume: VolumeGrid = None
+        self.volume_shaders = None
+        self.volume_state = None
+        self.volume_offset = Position(0, 0, 0)
+        self.volume_dirty = False
+
+        self.chunked_grid: ChunkedGrid = None
+        # Every chunk given data since the grid was last rebuilt, emptied when a new grid leaves it out
+        self.built_chunks: Set[Chunk] = set()
+        self.chunk_texture_names = []
+        # One {texture: buffer} dict per detail level (only level 0 without LOD)
+        self.chunk_buffers: Dict[Chunk, List[Dict[str, InstanceBuffer]]] = {}
+        self.pending_chunks: Dict[Chunk, List[Dict[str, Tuple]]] = {}
 
     def render(self, scene: Scene):
 
@@ -53,74 +126,377 @@ class GraphicsEngine:
             dtype=np.float32)
         glUniformMatrix4fv(self.viewMatrixLocation, 1, GL_FALSE, view_transform)
 
-        glBindVertexArray(self.cube_mesh.vao)
-
+        self.stats.reset_frame()
+        if self.instance_data_dirty:
+            self._upload_instance_data()
+
+        planes = frustum_planes(view_transform, self.projection_transform) if self.frustum_culling else None
+        if self.texture_array:
+            self._render_texture_array(planes)
+        else:
+            for texture_name, instance_buffer in self.instance_buffers.items():
+                if instance_buffer.count == 0:
+                    continue
+                texture = self.get_texture(texture_name)
+                texture.use()
+                self._draw_instances(instance_buffer, planes)
+
+        if self.chunk_buffers or self.pending_chunks:
+            self._render_chunks(planes, scene.player.position)
+
+        if self.voxel_mesh is not None:
+            self._render_voxel_mesh(view_transform)
+
+        if self.volume is not None and self.volume_state is not None:
+            self._render_volume(view_transform, scene.player.position)
+
+    def _render_chunks(self, planes: np.ndarray = None, eye: np.ndarray = None) -> None:
+        self._upload_chunks()
+
+        chunks = [chunk for chunk, level_buffers in self.chunk_buffers.items()
+                  if any(instance_buffer.count for instance_buffer in level_buffers[0].values())]
+        if not chunks:
+            return
+        if planes is not None:
+            mins = np.array(chunks, dtype=np.float32) * self.chunk_size - 0.5
+            visible = boxes_visible(mins, mins + self.chunk_size, planes)
+            chunks = [chunk for chunk, is_visible in zip(chunks, visible) if is_visible]
+            if not chunks:
+                return
+        levels = self._chunk_levels(chunks, eye) if self.lod and eye is not None else [0] * len(chunks)
+
+        if self.texture_array:
+            self.get_texture_array(self.chunk_texture_names).use()
+        scale = 1
+        for level, chunk in sorted(zip(levels, chunks)):
+            level_buffers = self.chunk_buffers[chunk]
+            level = min(level, len(level_buffers) - 1)
+            if self.lattice and 1 << level != scale:
+                scale = 1 << level
+                glUniform1f(self.cellScaleLocation, scale)
+            for texture_name, instance_buffer in level_buffers[level].items():
+                if instance_buffer.count == 0:
+                    continue
+                if not self.texture_array:
+                    self.get_texture(texture_name).use()
+                instance_buffer.draw()
+                self.stats.add_draw(instance_buffer.count)
+        if scale != 1:
+            glUniform1f(self.cellScaleLocation, 1.0)
+
+    @profiled("upload")
+    def _upload_chunks(self) -> None:
+        for chunk, levels in self.pending_chunks.items():
+            level_buffers = self.chunk_buffers.setdefault(chunk, [])
+            for level, groups in enumerate(levels):
+                if level == len(level_buffers):
+                    level_buffers.append({})
+                buffers = level_buffers[level]
+                for texture_name, instance_buffer in buffers.items():
+                    if texture_name not in groups:
+                        instance_buffer.count = 0
+                for texture_name, (instance_data, layers) in groups.items():
+                    if texture_name not in buffers:
+                        buffers[texture_name] = InstanceBuffer(self.cube_mesh, layered=layers is not None,
+                                                               lattice=self.lattice)
+                    self.stats.add_upload(buffers[texture_name].upload(instance_data, layers))
+        self.pending_chunks = {}
+
+    def _chunk_levels(self, chunks: List[Chunk], eye: np.ndarray) -> List[int]:
+        """Detail level of each chunk: 0 within ``lod_distance`` of ``eye``, one coarser per doubling of it."""
+        centres = (np.array(chunks, dtype=np.float32) + 0.5) * self.chunk_size - 0.5
+        distances = np.linalg.norm(centres - eye, axis=1)
+        levels = np.floor(np.log2(np.maximum(distances, 1e-6) / self.lod_distance)) + 1
+        return np.clip(levels, 0, self.lod_levels).astype(int).tolist()
+
+    @profiled("instances")
+    def update_chunked_grid(self, grid: np.ndarray, textures: Dict[int, str], cull_hidden: bool = True,
+                            changed: np.ndarray = None) -> int:
+        """Rebuild only the chunks of ``grid`` that changed since the last call and return how many there were.
+
+        Each chunk keeps its own instance buffers, re-uploaded on the next frame when rebuilt. With ``lod``
+        the chunks also keep coarser versions built from an occupancy pyramid of the grid, drawn as
+        scaled cubes once the chunk is far enough from the camera.
+        """
+        updates = self.build_chunk_updates(grid, textures, cull_hidden, changed)
+        self.apply_chunk_updates(updates)
+        return len(updates)
+
+    def build_chunk_updates(self, grid: np.ndarray, textures: Dict[int, str], cull_hidden: bool = True,
+                            changed: np.ndarray = None) -> Dict[Chunk, Dict[str, Tuple]]:
+        """CPU half of ``update_chunked_grid``, safe to run off the render thread (one caller at a time)."""
+        rebuild = self.chunked_grid is None or self.chunked_grid.cull_hidden != cull_hidden \
+            or self.chunked_grid.previous is None or self.chunked_grid.previous.shape != np.shape(grid)
+        if rebuild:
+            self.chunked_grid = ChunkedGrid(self.chunk_size, cull_hidden)
+            self.pyramid = None
+        states = list(textures)
+        self.chunk_texture_names = [textures[state] for state in states]
+        layer_lookup = np.zeros(max(states) + 1, dtype=np.uint16)
+        layer_lookup[states] = np.arange(len(states))
+
+        if self.lod:
+            previous = self.chunked_grid.previous
+            if changed is None and previous is not None and previous.shape == np.shape(grid):
+                changed = previous != grid
+            if self.pyramid is None or self.pyramid.states != max(states) + 1:
+                self.pyramid = OccupancyPyramid(self.lod_levels, max(states) + 1)
+            self.pyramid.update(grid, changed)
+
+        dirty = self.chunked_grid.update(grid, changed)
+        if self.lod:
+            # coarse cells look a whole coarse cell into the neighbouring chunks to drop hidden ones
+            dirty = self.chunked_grid.neighbours(dirty)
+
+        updates = {}
+        if rebuild:
+            # Chunks built for an earlier grid that this one does not cover are emptied; going through the
+            # updates keeps this off the GL buffers and survives merging with older pending updates
+            level_count = self.lod_levels + 1 if self.lod else 1
+            for chunk in self.built_chunks.difference(dirty):
+                updates[chunk] = [{} for _ in range(level_count)]
+            self.built_chunks = set()
+        self.built_chunks.update(dirty)
+        for chunk in dirty:
+            positions, cell_states = self.chunked_grid.chunk_cells(grid, chunk, states)
+            levels = [self._chunk_instance_data(positions, layer_lookup[cell_states])]
+            if self.lod:
+                low, high = self.chunked_grid.bounds(chunk)
+                for level in range(1, self.lod_levels + 1):
+                    coarse = self.pyramid.levels[level]
+                    scale = 1 << level
+                    coarse_high = np.minimum(-(-high // scale), coarse.shape)
+                    positions, cell_states = region_cells(coarse, low // scale, coarse_high, states, cull_hidden)
+                    levels.append(self._chunk_instance_data(positions, layer_lookup[cell_states], scale))
+            updates[chunk] = levels
+        return updates
+
+    @redraws
+    def apply_chunk_updates(self, updates: Dict[Chunk, Dict[str, Tuple]]) -> None:
+        self.pending_chunks.update(updates)
+
+    def _chunk_instance_data(self, positions: np.ndarray, layers: np.ndarray, scale: int = 1) -> Dict[str, Tuple]:
+        """Instance data per texture of cubes at ``positions``; coarse cubes of ``scale`` cells are given in
+        coarse cell coordinates."""
+        if self.texture_array:
+            groups = {None: (positions, layers)}
+        else:
+            groups = {}
+            for layer in np.unique(layers):
+                selected = layers == layer
+                groups[self.chunk_texture_names[layer]] = (positions[selected], None)
+
+        instance_data = {}
+        for texture_name, (group_positions, group_layers) in groups.items():
+            if len(group_positions) == 0:
+                continue
+            if self.lattice:
+                # Lattice cells already carry their layer
+                instance_data[texture_name] = (build_lattice_cells(group_positions, group_layers), None)
+            else:
+                matrices = build_model_matrices(group_positions * scale + (scale - 1) / 2)
+                if scale != 1:
+                    matrices[:, :3, :3] *= scale
+                instance_data[texture_name] = (matrices, group_layers)
+        return instance_data
+
+    def _render_voxel_mesh(self, view_transform: np.ndarray) -> None:
+        if self.voxel_mesh_dirty:
+            self.stats.add_upload(self.voxel_mesh.upload(self.voxel_vertices, self.voxel_ranges))
+            self.voxel_mesh_dirty = False
+        glUseProgram(self.mesh_shaders)
+        glUniformMatrix4fv(glGetUniformLocation(self.mesh_shaders, "view"), 1, GL_FALSE, view_transform)
+        draw_calls = self.voxel_mesh.draw(lambda texture_name: self.get_texture(texture_name).use())
+        self.stats.draw_calls += draw_calls
+
+    @redraws
+    @profiled("instances")
+    def update_voxel_mesh(self, grid: np.ndarray, textures: Dict[int, str],
+                          offset: Position = Position(0, 0, 0)) -> None:
+        """Replace the merged voxel surface drawn alongside the instanced cubes; call it when the grid changes."""
+        if self.voxel_mesh is None:
+            self.voxel_mesh = VoxelMesh()
+            self.mesh_shaders = self._create_shaders("shaders/vertex_mesh.txt", "shaders/fragment.txt")
+            glUseProgram(self.mesh_shaders)
+            glUniform1i(glGetUniformLocation(self.mesh_shaders, "imageTexture"), 0)
+            self._update_projection_matrix(self.window_size.width, self.window_size.height)
+        self.voxel_vertices, self.voxel_ranges = greedy_mesh(grid, textures, offset)
+        self.voxel_mesh_dirty = True
+
+    def _render_volume(self, view_transform: np.ndarray, eye: np.ndarray) -> None:
+        if self.volume_dirty:
+            self._upload_volume()
+        glUseProgram(self.volume_shaders)
+        glUniformMatrix4fv(glGetUniformLocation(self.volume_shaders, "view"), 1, GL_FALSE, view_transform)
+        glUniform3fv(glGetUniformLocation(self.volume_shaders, "eye"), 1, np.asarray(eye, dtype=np.float32))
+        # cell c is centred on c + offset like the instanced cubes
+        box_min = np.asarray(self.volume_offset, dtype=np.float32) - 0.5
+        glUniform3fv(glGetUniformLocation(self.volume_shaders, "boxMin"), 1, box_min)
+        glUniform3fv(glGetUniformLocation(self.volume_shaders, "boxSize"), 1,
+                     np.asarray(self.volume.shape, dtype=np.float32))
+        glUniform3iv(glGetUniformLocation(self.volume_shaders, "gridSize"), 1,
+                     np.asarray(self.volume.shape, dtype=np.int32))
+        self.volume.use()
+        # the back faces of the box still cover the screen when the camera is inside the grid
+        glCullFace(GL_FRONT)
+        self.volume.draw()
+        glCullFace(GL_BACK)
+        self.stats.draw_calls += 1
+
+    @profiled("upload")
+    def _upload_volume(self) -> None:
+        self.stats.add_upload(self.volume.upload(self.volume_state))
+        self.volume_dirty = False
+
+    @redraws
+    def update_volume(self, grid: np.ndarray, textures: Dict[int, str],
+                      offset: Position = Position(0, 0, 0)) -> None:
+        """Draw ``grid`` by ray-marching a 3D texture of its states; call it when the grid changes.
+
+        Each call only uploads the box around the cells that changed, and the draw cost follows the pixels the
+        grid covers rather than its population, which suits large dense automata.
+        """
+        if self.volume is None:
+            self.volume = VolumeGrid(self.cube_mesh)
+            self.volume_shaders = self._create_shaders("shaders/vertex_volume.txt", "shaders/fragment_volume.txt")
+            glUseProgram(self.volume_shaders)
+            glUniform1i(glGetUniformLocation(self.volume_shaders, "imageTexture"), 0)
+            glUniform1i(glGetUniformLocation(self.volume_shaders, "states"), 1)
+            glUniform1i(glGetUniformLocation(self.volume_shaders, "stateLayers"), 2)
+            self._update_projection_matrix(self.window_size.width, self.window_size.height)
+        self.volume.set_textures(textures)
+        self.volume_state = grid
+        self.volume_offset = offset
+        self.volume_dirty = True
+
+    def _render_texture_array(self, planes: np.ndarray = None) -> None:
+        if self.layered_instance_buffer is None or self.layered_instance_buffer.count == 0:
+            return
+        self.get_texture_array(self.layer_texture_names).use()
+        self._draw_instances(self.layered_instance_buffer, planes)
+
+    def _draw_instances(self, instance_buffer: InstanceBuffer, planes: np.ndarray = None) -> None:
+        if planes is None or instance_buffer.chunks is None:
+            instance_buffer.draw()
+            self.stats.add_draw(instance_buffer.count)
+            return
+        ranges = instance_buffer.chunks.visible_ranges(planes)
+        instance_buffer.draw_ranges(ranges)
+        for _, count in ranges:
+            self.stats.add_draw(count)
+
+    @profiled("upload")
+    def _upload_instance_data(self) -> None:
+        if self.texture_array:
+            if self.layered_instance_buffer is None:
+                self.layered_instance_buffer = InstanceBuffer(self.cube_mesh, layered=not self.lattice,
+                                                              lattice=self.lattice)
+            # Lattice cells already carry their layer
+            layers = None if self.lattice else self.instance_layers
+            self.stats.add_upload(self.layered_instance_buffer.upload(self.instance_data, layers))
+            self.layered_instance_buffer.chunks = self.chunks_by_texture.get(None)
+            self.instance_data_dirty = False
+            return
+
+        for texture_name, instance_buffer in self.instance_buffers.items():
+            if texture_name not in self.instance_data_per_texture:
+                instance_buffer.count = 0
         for texture_name, instance_data in self.instance_data_per_texture.items():
-            texture = self.get_texture(texture_name)
-            texture.use()
-
-            self.cube_mesh.update_instance_data(instance_data)
-
-            instance_count = len(instance_data)
-            glDrawArraysInstanced(GL_TRIANGLES, 0, self.cube_mesh.vertex_count, instance_count)
-
+            if texture_name not in self.instance_buffers:
+                self.instance_buffers[texture_name] = InstanceBuffer(self.cube_mesh, lattice=self.lattice)
+            self.stats.add_upload(self.instance_buffers[texture_name].upload(instance_data))
+            self.instance_buffers[texture_name].chunks = self.chunks_by_texture.get(texture_name)
+        self.instance_data_dirty = False
 
     def get_texture(self, texture_name: str) -> 'Material':
         if texture_name not in self.textures:
             self.textures[texture_name] = Material(f"textures/{texture_name}")
         return self.textures[texture_name]
 
-    def update_instance_buffer(self, cubes: List[Cube]) -> None:
-        self.cubes_by_texture = {}
-        for cube in cubes:
-            texture_name = cube.texture_name
-            if texture_name not in self.cubes_by_texture:
-                self.cubes_by_texture[texture_name] = []
-            self.cubes_by_texture[texture_name].append(cube)
+    def get_texture_array(self, texture_names: List[str]) -> 'TextureArrayMaterial':
+        if self.texture_array_names != texture_names:
+            if self.texture_array_material is not None:
+                self.texture_array_material.destroy()
+            self.texture_array_material = TextureArrayMaterial([f"textures/{name}" for name in texture_names])
+            self.texture_array_names = list(texture_names)
+        return self.texture_array_material
+
+    @profiled("instances")
+    def update_instance_buffer(self, cubes: CubeArray) -> None:
+        texture_ids = cubes.texture_ids
+        keys = chunk_keys(cubes.positions, self.chunk_size) if self.frustum_culling else None
+
+        # Sort by texture (unless the texture array makes it a per-instance layer), then by chunk
+        sort_keys = [] if self.texture_array else [texture_ids]
+        if keys is not None:
+            sort_keys.insert(0, keys)
+        order = np.lexsort(sort_keys) if sort_keys else np.arange(len(cubes))
+        self.instance_positions = cubes.positions[order]
+        self.instance_eulers = cubes.eulers[order]
+        if keys is not None:
+            keys = keys[order]
 
+        self.cubes_by_texture = {}
+        if self.texture_array:
+            # The texture id of each cube is directly its layer in the texture array
+            self.instance_layers = texture_ids[order]
+            self.layer_texture_names = list(cubes.texture_names)
+            self.cubes_by_texture[None] = slice(0, len(cubes))
+        else:
+            counts = np.bincount(texture_ids, minlength=len(cubes.texture_names))
+            offset = 0
+            for texture_id in np.flatnonzero(counts):
+                count = int(counts[texture_id])
+                self.cubes_by_texture[cubes.texture_names[texture_id]] = slice(offset, offset + count)
+                offset += count
+
+        self.chunks_by_texture = {}
+        if keys is not None:
+            for texture_name, group in self.cubes_by_texture.items():
+                self.chunks_by_texture[texture_name] = ChunkIndex(self.instance_positions[group], keys[group])
+
+    @redraws
+    @profiled("instances")
     def prepare_instance_data(self):
-        self.instance_data_per_texture = {}
-        for texture_name, cubes in self.cubes_by_texture.items():
-            instance_data = []
-            for cube in cubes:
-                model_transform = pyrr.matrix44.create_identity(dtype=np.float32)
-                model_transform = pyrr.matrix44.multiply(
-                    m1=model_transform,
-                    m2=pyrr.matrix44.create_from_eulers(
-                        eulers=np.radians(cube.eulers),
-                        dtype=np.float32
-                    )
-                )
-                model_transform = pyrr.matrix44.multiply(
-                    m1=model_transform,
-                    m2=pyrr.matrix44.create_from_translation(
-                        vec=cube.position,
-                        dtype=np.float32
-                    )
-                )
-                instance_data.append(model_transform)
-            instance_data = np.array(instance_data, dtype=np.float32)
-            self.instance_data_per_texture[texture_name] = instance_data
+        if self.lattice:
+            if np.any(self.instance_eulers):
+                raise ValueError("Lattice instancing does not support rotated cubes")
+            cells = self.lattice_cells.reserve(len(self.instance_positions))
+            self.instance_data = build_lattice_cells(self.instance_positions, self.instance_layers, out=cells)
+        else:
+            matrices = self.model_matrices.reserve(len(self.instance_positions))
+            self.instance_data = build_model_matrices(self.instance_positions, self.instance_eulers, out=matrices)
+        if self.texture_array:
+            self.instance_data_dirty = True
+            return
+        self.instance_data_per_texture = {
+            texture_name: self.instance_data[group] for texture_name, group in self.cubes_by_texture.items()
+        }
+        self.instance_data_dirty = True
 
     def quit(self) -> None:
+        for instance_buffer in self.instance_buffers.values():
+            instance_buffer.destroy()
+        if self.layered_instance_buffer is not None:
+            self.layered_instance_buffer.destroy()
+        for level_buffers in self.chunk_buffers.values():
+            for buffers in level_buffers:
+                for instance_buffer in buffers.values():
+                    instance_buffer.destroy()
+        if self.texture_array_material is not None:
+            self.texture_array_material.destroy()
+        if self.voxel_mesh is not None:
+            self.voxel_mesh.destroy()
+            glDeleteProgram(self.mesh_shaders)
+        if self.volume is not None:
+            self.volume.destroy()
+            glDeleteProgram(self.volume_shaders)
         self.cube_mesh.destroy()
-        self.wave_texture.destroy()
         glDeleteProgram(self.shaders)
 
     @staticmethod
-    def _create_shaders(vertex_path: str, fragment_path: str) -> ShaderProgram:
-        def read_shader_source(path: str) -> str:
-            with open(path, 'r') as file:
-                return file.read()
-
-        vertex_src = read_shader_source(vertex_path)
-        fragment_src = read_shader_source(fragment_path)
-
-        shaders = compileProgram(
-            compileShader(vertex_src, GL_VERTEX_SHADER),
-            compileShader(fragment_src, GL_FRAGMENT_SHADER)
-        )
-        return shaders
+    def _create_shaders(vertex_path: str, fragment_path: str) -> int:
+        return load_program([(vertex_path, GL_VERTEX_SHADER), (fragment_path, GL_FRAGMENT_SHADER)])
 
     @staticmethod
     def set_clear_color(color:Color)->None:
@@ -131,16 +507,24 @@ class GraphicsEngine:
         glUseProgram(self.shaders)
         self._update_projection_matrix(width, height)
 
+    @redraws
     def _update_projection_matrix(self, width: int, height: int) -> None:
         aspect_ratio = width / height
         projection_transform = pyrr.matrix44.create_perspective_projection(
             fovy=self.fov, aspect=aspect_ratio,
             near=self.near, far=self.far, dtype=np.float32
         )
+        self.projection_transform = projection_transform
+        glUseProgram(self.shaders)
         glUniformMatrix4fv(
             self.projectionMatrixLocation,
             1, GL_FALSE, projection_transform
         )
+        for shaders in (self.mesh_shaders, self.volume_shaders):
+            if shaders is not None:
+                glUseProgram(shaders)
+                glUniformMatrix4fv(glGetUniformLocation(shaders, "projection"), 1, GL_FALSE, projection_transform)
+        glUseProgram(self.shaders)
 
     def set_near(self,near:float)->None:
         self.near = near
@@ -152,4 +536,13 @@ class GraphicsEngine:
 
     def set_fov(self,fov:float)->None:
         self.fov = fov
-        self._update_projection_matrix(self.window_size.width,self.window_size.height)
\ No newline at end of file
+        self._update_projection_matrix(self.window_size.width,self.window_size.height)
+
+
+class CpuGraphicsEngine(GraphicsEngine):
+    """GraphicsEngine holding only the state of its CPU-side instance pipeline, usable without an OpenGL
+    context; the methods issuing GL calls must not be called on it."""
+
+    def __init__(self, texture_array: bool = False, lattice: bool = False, frustum_culling: bool = True,
+                 lod: bool = False) -> None:
+        self._init_instance_state(texture_array, lattice, frustum_culling, lod)
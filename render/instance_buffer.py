@@ -0,0 +1,64 @@
+from typing import List, Tuple
+
+import numpy as np
+from OpenGL.GL import *
+
+from render.culling import ChunkIndex
+from render.cube_mesh import CubeMesh
+
+
+class InstanceBuffer:
+    """Instance VBO with its own VAO, grown geometrically and refilled with orphaning + glBufferSubData.
+
+    A layered buffer carries a second per-instance uint16 texture layer stream (attribute 6).
+    A lattice buffer holds int16 (x, y, z, layer) cells instead of mat4 model matrices.
+    """
+
+    def __init__(self, mesh: CubeMesh, layered: bool = False, lattice: bool = False) -> None:
+        self.mesh = mesh
+        self.vbo = glGenBuffers(1)
+        self.layer_vbo = glGenBuffers(1) if layered else None
+        self.vao = mesh.create_instance_vao(self.vbo, self.layer_vbo, lattice)
+        self.lattice = lattice
+        self.chunks: ChunkIndex = None
+        self.capacity = 0
+        self.layer_capacity = 0
+        self.count = 0
+
+    def upload(self, instance_data: np.ndarray, layers: np.ndarray = None) -> int:
+        self.capacity, nbytes = self._write(self.vbo, self.capacity, instance_data)
+        if layers is not None:
+            layers = np.asarray(layers, dtype=np.uint16)
+            self.layer_capacity, layer_nbytes = self._write(self.layer_vbo, self.layer_capacity, layers)
+            nbytes += layer_nbytes
+        self.count = len(instance_data)
+        return nbytes
+
+    def draw(self) -> None:
+        glBindVertexArray(self.vao)
+        glDrawArraysInstanced(GL_TRIANGLES, 0, self.mesh.vertex_count, self.count)
+
+    def draw_ranges(self, ranges: List[Tuple[int, int]]) -> None:
+        glBindVertexArray(self.vao)
+        for first, count in ranges:
+            self.mesh.point_instance_attributes(self.vbo, self.layer_vbo, self.lattice, first)
+            glDrawArraysInstanced(GL_TRIANGLES, 0, self.mesh.vertex_count, count)
+        if ranges and ranges[-1][0] != 0:
+            self.mesh.point_instance_attributes(self.vbo, self.layer_vbo, self.lattice)
+
+    def destroy(self) -> None:
+        buffers = [self.vbo] if self.layer_vbo is None else [self.vbo, self.layer_vbo]
+        glDeleteBuffers(len(buffers), buffers)
+        glDeleteVertexArrays(1, [self.vao])
+
+    @staticmethod
+    def _write(vbo: int, capacity: int, data: np.ndarray) -> tuple:
+        data = np.ascontiguousarray(data)
+        nbytes = data.nbytes
+        glBindBuffer(GL_ARRAY_BUFFER, vbo)
+        if nbytes > capacity:
+            capacity = max(nbytes, 2 * capacity)
+        glBufferData(GL_ARRAY_BUFFER, capacity, None, GL_DYNAMIC_DRAW)
+        if nbytes:
+            glBufferSubData(GL_ARRAY_BUFFER, 0, nbytes, data)
+        return capacity, nbytes
@@ -0,0 +1,72 @@
+from typing import List
+
+import numpy as np
+
+_CHILD_OFFSETS = np.array(list(np.ndindex(2, 2, 2)))
+
+
+class OccupancyPyramid:
+    """Mip pyramid of a state grid, each level halving the previous one by 2×2×2 reductions.
+
+    A coarse cell takes the most common non-zero state of its eight children when at least ``threshold``
+    of them are occupied: 1 keeps every occupied region visible (occupancy), 4 or more follows the
+    majority. ``levels[0]`` is the last grid given to ``update``.
+    """
+
+    def __init__(self, depth: int, states: int, threshold: int = 1) -> None:
+        self.depth = depth
+        self.states = states
+        self.threshold = threshold
+        self.levels: List[np.ndarray] = []
+
+    def update(self, grid: np.ndarray, changed: np.ndarray = None) -> None:
+        """Reduce ``grid``; with a ``changed`` mask only the coarse cells above changed cells are recomputed."""
+        grid = np.asarray(grid)
+        if changed is None or not self.levels or self.levels[0].shape != grid.shape:
+            self.levels = [grid]
+            for _ in range(self.depth):
+                self.levels.append(self._reduce(self.levels[-1]))
+            return
+
+        self.levels[0] = grid
+        for level in range(1, self.depth + 1):
+            parents = np.argwhere(_reduce_any(changed))
+            if len(parents) == 0:
+                return
+            coarse = self.levels[level]
+            values = self._reduce_at(self.levels[level - 1], parents)
+            index = tuple(parents.T)
+            changed = np.zeros(coarse.shape, dtype=bool)
+            changed[index] = coarse[index] != values
+            coarse[index] = values
+
+    def _reduce(self, child: np.ndarray) -> np.ndarray:
+        padding = [(0, size % 2) for size in child.shape]
+        if any(pad for _, pad in padding):
+            child = np.pad(child, padding)
+        x, y, z = (size // 2 for size in child.shape)
+        blocks = child.reshape(x, 2, y, 2, z, 2).transpose(0, 2, 4, 1, 3, 5).reshape(x, y, z, 8)
+        return self._combine(blocks)
+
+    def _reduce_at(self, child: np.ndarray, parents: np.ndarray) -> np.ndarray:
+        coords = parents[:, None, :] * 2 + _CHILD_OFFSETS
+        inside = np.all(coords < child.shape, axis=2)
+        coords = np.minimum(coords, np.array(child.shape) - 1)
+        values = child[coords[..., 0], coords[..., 1], coords[..., 2]]
+        return self._combine(np.where(inside, values, 0))
+
+    def _combine(self, children: np.ndarray) -> np.ndarray:
+        """Coarse state of (..., 8) children."""
+        if self.states <= 2:
+            occupied = np.count_nonzero(children, axis=-1)
+            return (occupied >= self.threshold).astype(np.uint8)
+        counts = np.stack([np.count_nonzero(children == state, axis=-1) for state in range(1, self.states)], axis=-1)
+        parent = (np.argmax(counts, axis=-1) + 1).astype(np.uint8)
+        parent[counts.sum(axis=-1) < self.threshold] = 0
+        return parent
+
+
+def _reduce_any(mask: np.ndarray) -> np.ndarray:
+    for axis, size in enumerate(mask.shape):
+        mask = np.logical_or.reduceat(mask, np.arange(0, size, 2), axis=axis)
+    return mask
@@ -1,5 +1,9 @@
+from typing import List
+
+import numpy as np
 from OpenGL.GL import *
-from PIL import Image
+
+from render.cache import load_rgba
 
 class Material:
     def __init__(self, filepath:str) -> None:
@@ -10,16 +14,43 @@ class Material:
         glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST_MIPMAP_LINEAR)
         glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
 
-        with Image.open(filepath,mode="r") as image:
-            image_width, image_height = image.size
-            image = image.convert("RGBA")
-            image_data = bytes(image.tobytes())
-            glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, image_width, image_height, 0, GL_RGBA, GL_UNSIGNED_BYTE, image_data)
-            glGenerateMipmap(GL_TEXTURE_2D)
+        image_data = np.ascontiguousarray(load_rgba(filepath))
+        image_height, image_width = image_data.shape[:2]
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, image_width, image_height, 0, GL_RGBA, GL_UNSIGNED_BYTE, image_data)
+        glGenerateMipmap(GL_TEXTURE_2D)
 
     def use(self) -> None:
         glActiveTexture(GL_TEXTURE0)
         glBindTexture(GL_TEXTURE_2D, self.texture)
 
     def destroy(self) -> None:
-        glDeleteTextures(1, self.texture)
\ No newline at end of file
+        glDeleteTextures(1, self.texture)
+
+class TextureArrayMaterial:
+    def __init__(self, filepaths: List[str]) -> None:
+        self.texture = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D_ARRAY, self.texture)
+        glTexParameteri(GL_TEXTURE_2D_ARRAY, GL_TEXTURE_WRAP_S, GL_REPEAT)
+        glTexParameteri(GL_TEXTURE_2D_ARRAY, GL_TEXTURE_WRAP_T, GL_REPEAT)
+        glTexParameteri(GL_TEXTURE_2D_ARRAY, GL_TEXTURE_MIN_FILTER, GL_NEAREST_MIPMAP_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D_ARRAY, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+
+        # Every layer must share the size of the first image
+        first = load_rgba(filepaths[0])
+        image_height, image_width = first.shape[:2]
+        layers = np.empty((len(filepaths), image_height, image_width, 4), dtype=np.uint8)
+        layers[0] = first
+        for layer, filepath in enumerate(filepaths[1:], start=1):
+            layers[layer] = load_rgba(filepath, size=(image_width, image_height))
+
+        glTexImage3D(GL_TEXTURE_2D_ARRAY, 0, GL_RGBA, image_width, image_height, len(layers), 0,
+                     GL_RGBA, GL_UNSIGNED_BYTE, layers)
+        glGenerateMipmap(GL_TEXTURE_2D_ARRAY)
+        self.layer_count = len(layers)
+
+    def use(self) -> None:
+        glActiveTexture(GL_TEXTURE0)
+        glBindTexture(GL_TEXTURE_2D_ARRAY, self.texture)
+
+    def destroy(self) -> None:
+        glDeleteTextures(1, self.texture)
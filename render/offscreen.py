@@ -0,0 +1,212 @@
+import os
+from typing import Callable, Iterable, Tuple
+
+import numpy as np
+
+# The GL platform is chosen when OpenGL is first imported, so this module must be imported before any
+# other render module (or PYOPENGL_PLATFORM set) for the headless context to be used.
+os.environ.setdefault("PYOPENGL_PLATFORM", "egl")
+# Mesa's EGL otherwise probes for an X11/Wayland display and fails on headless machines
+os.environ.setdefault("EGL_PLATFORM", "surfaceless")
+
+from OpenGL.GL import *
+
+from render.graphics import GraphicsEngine
+from render.scene import Scene
+from render.utils import Position, WindowSize
+
+CameraPose = Tuple[Position, float, float]
+
+
+class OffscreenContext:
+    """OpenGL 3.3 core context without a window, from EGL (default) or OSMesa as picked by PYOPENGL_PLATFORM."""
+
+    def __init__(self, width: int, height: int) -> None:
+        self.platform = os.environ["PYOPENGL_PLATFORM"]
+        if self.platform == "osmesa":
+            self._create_osmesa(width, height)
+        elif self.platform == "egl":
+            self._create_egl()
+        else:
+            raise ValueError(f"Offscreen rendering needs PYOPENGL_PLATFORM egl or osmesa, not {self.platform!r}")
+
+    def _create_egl(self) -> None:
+        from OpenGL import EGL
+
+        self.display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+        major, minor = EGL.EGLint(), EGL.EGLint()
+        if not EGL.eglInitialize(self.display, major, minor):
+            raise Exception("Failed to initialise EGL")
+        attributes = [EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT, EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT,
+                      EGL.EGL_NONE]
+        config = EGL.EGLConfig()
+        count = EGL.EGLint()
+        if not EGL.eglChooseConfig(self.display, attributes, config, 1, count) or count.value == 0:
+            raise Exception("No EGL configuration supports desktop OpenGL")
+        EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+        context_attributes = [EGL.EGL_CONTEXT_MAJOR_VERSION, 3, EGL.EGL_CONTEXT_MINOR_VERSION, 3,
+                              EGL.EGL_CONTEXT_OPENGL_PROFILE_MASK, EGL.EGL_CONTEXT_OPENGL_CORE_PROFILE_BIT,
+                              EGL.EGL_NONE]
+        self.context = EGL.eglCreateContext(self.display, config, EGL.EGL_NO_CONTEXT, context_attributes)
+        if not self.context:
+            raise Exception("Failed to create an EGL OpenGL 3.3 context")
+        # Rendering goes to our own framebuffer object, so no surface is needed
+        if not EGL.eglMakeCurrent(self.display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, self.context):
+            raise Exception("Failed to make the EGL context current")
+
+    def _create_osmesa(self, width: int, height: int) -> None:
+        from OpenGL import osmesa, arrays
+
+        attributes = [osmesa.OSMESA_FORMAT, osmesa.OSMESA_RGBA, osmesa.OSMESA_DEPTH_BITS, 24,
+                      osmesa.OSMESA_PROFILE, osmesa.OSMESA_CORE_PROFILE,
+                      osmesa.OSMESA_CONTEXT_MAJOR_VERSION, 3, osmesa.OSMESA_CONTEXT_MINOR_VERSION, 3, 0]
+        self.context = osmesa.OSMesaCreateContextAttribs(attributes, None)
+        if not self.context:
+            raise Exception("Failed to create an OSMesa OpenGL 3.3 context")
+        self._osmesa_buffer = arrays.GLubyteArray.zeros((height, width, 4))
+        if not osmesa.OSMesaMakeCurrent(self.context, self._osmesa_buffer, GL_UNSIGNED_BYTE, width, height):
+            raise Exception("Failed to make the OSMesa context current")
+
+    def destroy(self) -> None:
+        if self.platform == "egl":
+            from OpenGL import EGL
+
+            EGL.eglMakeCurrent(self.display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, EGL.EGL_NO_CONTEXT)
+            EGL.eglDestroyContext(self.display, self.context)
+            EGL.eglTerminate(self.display)
+        else:
+            from OpenGL import osmesa
+
+            osmesa.OSMesaDestroyContext(self.context)
+
+
+class Framebuffer:
+    def __init__(self, width: int, height: int) -> None:
+        self.width, self.height = width, height
+        self.fbo = glGenFramebuffers(1)
+        glBindFramebuffer(GL_FRAMEBUFFER, self.fbo)
+
+        self.color = glGenRenderbuffers(1)
+        glBindRenderbuffer(GL_RENDERBUFFER, self.color)
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_RGBA8, width, height)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_RENDERBUFFER, self.color)
+
+        self.depth = glGenRenderbuffers(1)
+        glBindRenderbuffer(GL_RENDERBUFFER, self.depth)
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_DEPTH_COMPONENT24, width, height)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_DEPTH_ATTACHMENT, GL_RENDERBUFFER, self.depth)
+
+        if glCheckFramebufferStatus(GL_FRAMEBUFFER) != GL_FRAMEBUFFER_COMPLETE:
+            raise Exception("Incomplete offscreen framebuffer")
+        glViewport(0, 0, width, height)
+
+    def read_rgba(self) -> np.ndarray:
+        """(height, width, 4) uint8 pixels, top row first."""
+        glBindFramebuffer(GL_FRAMEBUFFER, self.fbo)
+        glPixelStorei(GL_PACK_ALIGNMENT, 1)
+        data = glReadPixels(0, 0, self.width, self.height, GL_RGBA, GL_UNSIGNED_BYTE)
+        pixels = np.frombuffer(data, dtype=np.uint8).reshape(self.height, self.width, 4)
+        return pixels[::-1]
+
+    def destroy(self) -> None:
+        glDeleteRenderbuffers(2, [self.color, self.depth])
+        glDeleteFramebuffers(1, [self.fbo])
+
+
+class OffscreenRenderer:
+    """GraphicsEngine and Scene rendering into an offscreen framebuffer instead of a GLFW window."""
+
+    def __init__(self, window_size: WindowSize = WindowSize(640, 480), **renderer_options) -> None:
+        self.window_size = window_size
+        self.context = OffscreenContext(window_size.width, window_size.height)
+        self.framebuffer = Framebuffer(window_size.width, window_size.height)
+        self.renderer = GraphicsEngine(window_size, **renderer_options)
+        self.scene = Scene()
+
+    def set_camera(self, position: Position, theta: float, phi: float) -> None:
+        self.scene.set_player_position(*position)
+        self.scene.player.theta = theta
+        self.scene.player.phi = phi
+        self.scene.player.update_vectors()
+
+    def render_frame(self) -> np.ndarray:
+        glBindFramebuffer(GL_FRAMEBUFFER, self.framebuffer.fbo)
+        self.renderer.render(self.scene)
+        glFinish()
+        return self.framebuffer.read_rgba()
+
+    def quit(self) -> None:
+        self.renderer.quit()
+        self.framebuffer.destroy()
+        self.context.destroy()
+
+
+class PngSequenceWriter:
+    def __init__(self, directory: str, pattern: str = "frame_{:05d}.png") -> None:
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.pattern = pattern
+        self.count = 0
+
+    def write(self, frame: np.ndarray) -> None:
+        from PIL import Image
+
+        Image.fromarray(frame, mode="RGBA").save(os.path.join(self.directory, self.pattern.format(self.count)))
+        self.count += 1
+
+    def close(self) -> None:
+        pass
+
+
+class RawStreamWriter:
+    """Concatenated raw RGBA frames, e.g. for ``ffmpeg -f rawvideo -pix_fmt rgba -s WxH -i -``."""
+
+    def __init__(self, stream) -> None:
+        self.stream = stream
+        self.count = 0
+
+    def write(self, frame: np.ndarray) -> None:
+        self.stream.write(np.ascontiguousarray(frame).tobytes())
+        self.count += 1
+
+    def close(self) -> None:
+        self.stream.flush()
+
+
+def orbit_camera(center: Position, radius: float, height: float, frames_per_turn: int) -> Callable[[int], CameraPose]:
+    """Camera path circling ``center`` once every ``frames_per_turn`` frames while looking at it."""
+    center = np.asarray(center, dtype=np.float32)
+
+    def pose(frame: int) -> CameraPose:
+        angle = 2 * np.pi * frame / frames_per_turn
+        eye = center + np.array([radius * np.cos(angle), radius * np.sin(angle), height], dtype=np.float32)
+        direction = center - eye
+        theta = float(np.degrees(np.arctan2(direction[1], direction[0]))) % 360
+        phi = float(np.degrees(np.arctan2(direction[2], np.hypot(direction[0], direction[1]))))
+        return Position(*eye.tolist()), theta, phi
+
+    return pose
+
+
+def render_generations(offscreen: OffscreenRenderer, states: Iterable[np.ndarray], textures: dict, writer,
+                       camera_path: Callable[[int], CameraPose] = None, frame_skip: int = 1,
+                       volume: bool = False) -> int:
+    """Render every ``frame_skip``-th state of ``states`` to ``writer`` one frame at a time; returns frames written.
+
+    States are consumed lazily and each frame is written before the next one is rendered, so memory stays
+    bounded however long the run is. ``volume`` ray-marches the grid instead of drawing chunked cubes.
+    """
+    written = 0
+    for index, state in enumerate(states):
+        if index % frame_skip:
+            continue
+        if volume:
+            offscreen.renderer.update_volume(state, textures)
+        else:
+            offscreen.renderer.update_chunked_grid(state, textures)
+        if camera_path is not None:
+            offscreen.set_camera(*camera_path(written))
+        writer.write(offscreen.render_frame())
+        written += 1
+    writer.close()
+    return written
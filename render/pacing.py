@@ -0,0 +1,83 @@
+import functools
+import time
+from typing import Callable
+
+import glfw
+
+PACING_MODES = ("unlimited", "vsync", "capped", "on_demand")
+
+# time.sleep may overshoot by about this much, so the end of a capped frame's wait only yields
+_SLEEP_SLACK = 0.001
+
+
+class FrameScheduler:
+    """Decides when the render loop waits and whether it draws.
+
+    ``unlimited`` draws as fast as possible, ``vsync`` once per display refresh and ``capped`` at most
+    ``max_fps`` times per second. ``on_demand`` (vsync'd as well) only draws after ``request_redraw`` and
+    otherwise blocks in ``glfw.wait_events_timeout``, so a window showing a still scene costs no CPU while
+    input still wakes it at once.
+    """
+
+    def __init__(self, mode: str = "unlimited", max_fps: float = 60.0, idle_timeout: float = 0.5) -> None:
+        if mode not in PACING_MODES:
+            raise ValueError(f"Unknown frame pacing {mode!r}, expected one of {', '.join(PACING_MODES)}")
+        self.mode = mode
+        self.max_fps = max_fps
+        self.idle_timeout = idle_timeout
+        self.needs_redraw = True
+        self._next_frame = None
+
+    @property
+    def swap_interval(self) -> int:
+        return 1 if self.mode in ("vsync", "on_demand") else 0
+
+    def request_redraw(self) -> None:
+        self.needs_redraw = True
+
+    def wait(self, animating: bool = False) -> float:
+        """Process the pending events, first waiting as long as the mode asks for.
+
+        ``animating`` keeps an ``on_demand`` loop running without events, e.g. while a movement key is held.
+        Returns the seconds spent blocked waiting for events, which do not count as frame time.
+        """
+        if self.mode == "capped":
+            self._sleep_until_next_frame()
+        elif self.mode == "on_demand" and not (self.needs_redraw or animating):
+            start = time.perf_counter()
+            glfw.wait_events_timeout(self.idle_timeout)
+            return time.perf_counter() - start
+        glfw.poll_events()
+        return 0.0
+
+    def should_draw(self) -> bool:
+        return self.mode != "on_demand" or self.needs_redraw
+
+    def frame_drawn(self) -> None:
+        self.needs_redraw = False
+
+    def _sleep_until_next_frame(self) -> None:
+        interval = 1 / self.max_fps
+        now = time.perf_counter()
+        if self._next_frame is None or now - self._next_frame > interval:
+            # first frame, or more than a frame late: start over instead of rushing to catch up
+            self._next_frame = now
+        remaining = self._next_frame - now
+        if remaining > _SLEEP_SLACK:
+            time.sleep(remaining - _SLEEP_SLACK)
+        while time.perf_counter() < self._next_frame:
+            time.sleep(0)
+        self._next_frame += interval
+
+
+def redraws(method: Callable) -> Callable:
+    """Request a redraw from the ``scheduler`` attribute (if set) of the object once ``method`` returns."""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        if self.scheduler is not None:
+            self.scheduler.request_redraw()
+        return result
+
+    return wrapper
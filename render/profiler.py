@@ -0,0 +1,193 @@
+import csv
+import functools
+import json
+from contextlib import nullcontext
+from time import perf_counter
+from typing import Callable, Dict, List
+
+import numpy as np
+from OpenGL.GL import *
+
+from render.stats import FrameStats
+
+PHASES = ("input", "simulation", "update", "scene", "instances", "upload", "draw", "swap")
+COUNTERS = ("instances_drawn", "draw_calls", "bytes_uploaded")
+COLUMNS = ("frame",) + PHASES + ("cpu", "gpu") + COUNTERS
+
+# GPU timings are read back a few frames late so the CPU never waits on them
+_GPU_QUERIES = 4
+_NULL_PHASE = nullcontext()
+
+
+class _Phase:
+    """Reusable timing context of one phase; time spent in nested phases is only counted in those."""
+
+    __slots__ = ("profiler", "column", "start", "children")
+
+    def __init__(self, profiler: "FrameProfiler", column: int) -> None:
+        self.profiler = profiler
+        self.column = column
+        self.start = 0.0
+        self.children = 0.0
+
+    def __enter__(self) -> None:
+        self.children = 0.0
+        self.profiler._stack.append(self)
+        self.start = perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        elapsed = perf_counter() - self.start
+        stack = self.profiler._stack
+        stack.pop()
+        self.profiler._current[self.column] += elapsed - self.children
+        if stack:
+            stack[-1].children += elapsed
+
+
+class FrameProfiler:
+    """Per-frame phase timings (ms), GPU time and draw counters kept in a ring of the last ``capacity`` frames.
+
+    Disabled profilers hand out a shared no-op context from ``phase``, so instrumented code costs one
+    attribute check when profiling is off. Each recorded frame is also passed to the ``hooks`` as a dict.
+    """
+
+    def __init__(self, capacity: int = 1024, gpu: bool = True) -> None:
+        self.capacity = capacity
+        self.gpu = gpu
+        self.enabled = False
+        self.hooks: List[Callable[[Dict[str, float]], None]] = []
+        self.frame = 0
+        self._data = np.full((capacity, len(COLUMNS)), np.nan)
+        self._current = np.zeros(len(COLUMNS))
+        self._phases = {name: _Phase(self, COLUMNS.index(name)) for name in PHASES}
+        self._stack: List[_Phase] = []
+        self._frame_start = 0.0
+        # only frames begun while enabled are recorded, so enabling mid-frame waits for the next one
+        self._in_frame = False
+        self._queries = None
+        self._query_frames = [-1] * _GPU_QUERIES
+        self._query_active = False
+
+    def enable(self) -> None:
+        if self.gpu and self._queries is None:
+            try:
+                self._queries = list(glGenQueries(_GPU_QUERIES))
+            except GLError:
+                self.gpu = False
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+        self._in_frame = False
+
+    def phase(self, name: str):
+        """Context timing ``name`` (one of ``PHASES``) for the current frame."""
+        if not self._in_frame:
+            return _NULL_PHASE
+        return self._phases[name]
+
+    def begin_frame(self) -> None:
+        if not self.enabled:
+            return
+        self._current[:] = 0
+        self._current[COLUMNS.index("gpu")] = np.nan
+        self._frame_start = perf_counter()
+        self._in_frame = True
+
+    def begin_gpu(self) -> None:
+        if not self._in_frame or not self.gpu:
+            return
+        slot = self.frame % _GPU_QUERIES
+        if self._query_frames[slot] != -1:
+            # that query has not come back yet, skip timing this frame rather than stall
+            return
+        glBeginQuery(GL_TIME_ELAPSED, self._queries[slot])
+        self._query_frames[slot] = self.frame
+        self._query_active = True
+
+    def end_gpu(self) -> None:
+        if self._query_active:
+            glEndQuery(GL_TIME_ELAPSED)
+            self._query_active = False
+
+    def end_frame(self, stats: FrameStats = None) -> None:
+        if not self._in_frame:
+            return
+        self._in_frame = False
+        self.end_gpu()
+        current = self._current
+        current[0] = self.frame
+        current[COLUMNS.index("cpu")] = perf_counter() - self._frame_start
+        # seconds to milliseconds
+        current[1:len(PHASES) + 2] *= 1000
+        if stats is not None:
+            for name in COUNTERS:
+                current[COLUMNS.index(name)] = getattr(stats, name)
+        self._data[self.frame % self.capacity] = current
+        self._collect_gpu_times()
+
+        if self.hooks:
+            row = dict(zip(COLUMNS, current.tolist()))
+            for hook in self.hooks:
+                hook(row)
+        self.frame += 1
+
+    def history(self) -> Dict[str, np.ndarray]:
+        """Recorded columns, oldest frame first."""
+        count = min(self.frame, self.capacity)
+        rows = self._data[(np.arange(count) + self.frame - count) % self.capacity]
+        return {name: rows[:, index] for index, name in enumerate(COLUMNS)}
+
+    def summary(self) -> Dict[str, float]:
+        """Mean of every column over the recorded frames (GPU over the frames that got a timing)."""
+        return {name: float(np.nanmean(values)) if np.any(~np.isnan(values)) else float("nan")
+                for name, values in self.history().items() if name != "frame"}
+
+    def to_csv(self, path: str) -> None:
+        history = self.history()
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(COLUMNS)
+            writer.writerows(zip(*(history[name].tolist() for name in COLUMNS)))
+
+    def to_json(self, path: str) -> None:
+        history = {name: [None if np.isnan(value) else value for value in values.tolist()]
+                   for name, values in self.history().items()}
+        with open(path, "w") as file:
+            json.dump(history, file)
+
+    def destroy(self) -> None:
+        if self._queries is not None:
+            glDeleteQueries(len(self._queries), self._queries)
+            self._queries = None
+        # a profiler replaced mid-frame is still ended by the loop, which must not read deleted queries
+        self._query_frames = [-1] * _GPU_QUERIES
+        self.enabled = False
+        self._in_frame = False
+
+    def _collect_gpu_times(self) -> None:
+        for slot, frame in enumerate(self._query_frames):
+            if frame == -1 or glGetQueryObjectiv(self._queries[slot], GL_QUERY_RESULT_AVAILABLE) == GL_FALSE:
+                continue
+            # 32 bits of nanoseconds cover frames up to 4 s (PyOpenGL cannot size the 64 bit variant)
+            nanoseconds = glGetQueryObjectuiv(self._queries[slot], GL_QUERY_RESULT)
+            if self.frame - frame < self.capacity:
+                self._data[frame % self.capacity, COLUMNS.index("gpu")] = int(nanoseconds) / 1e6
+            self._query_frames[slot] = -1
+
+
+def profiled(phase: str) -> Callable:
+    """Time a method of an object carrying a ``profiler`` attribute as ``phase``."""
+
+    def decorate(method: Callable) -> Callable:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            profiler = self.profiler
+            if profiler is None or not profiler.enabled:
+                return method(self, *args, **kwargs)
+            with profiler.phase(phase):
+                return method(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorate
@@ -1,28 +1,42 @@
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Callable
 
 from OpenGL.GL import *
 import glfw.GLFW as GLFW_CONSTANTS
 import numpy as np
 import glfw
 
+from automata.history import GenerationHistory
 from render.config import PLAYER_SPEED
 from render.graphics import GraphicsEngine
+from render.pacing import FrameScheduler
+from render.profiler import FrameProfiler
 from render.scene import Scene
+from render.simulation import SimulationThread
 from render.utils import WindowSize
 
 
 
 class BaseApp(ABC):
-    def __init__(self, window_name: str = "OpenGL", window_size=WindowSize(640, 480)) -> None:
+    def __init__(self, window_name: str = "OpenGL", window_size=WindowSize(640, 480),
+                 texture_array: bool = False, lattice: bool = False, frustum_culling: bool = True,
+                 lod: bool = False, frame_pacing: str = "unlimited", max_fps: float = 60.0) -> None:
         self.window_title = window_name
         self.window_size = window_size
         self.cursor_pos = None
         self.on_move = None
+        self.scheduler = FrameScheduler(frame_pacing, max_fps)
         self.window = self._init_glfw()
 
-        self.renderer = GraphicsEngine(self.window_size)
+        self.renderer = GraphicsEngine(self.window_size, texture_array=texture_array, lattice=lattice,
+                                       frustum_culling=frustum_culling, lod=lod)
         self.scene = Scene()
+        self.profiler = FrameProfiler()
+        self.renderer.profiler = self.profiler
+        self.renderer.scheduler = self.scheduler
+        self.scene.scheduler = self.scheduler
+        # Whether the camera moved last frame, keeping an on-demand loop polling while a key is held
+        self.animating = False
 
         self.lastTime = glfw.get_time()
         self.currentTime = 0
@@ -34,28 +48,186 @@ class BaseApp(ABC):
 
         glfw.set_window_size_callback(self.window, self._on_window_size_change)
         glfw.set_key_callback(self.window, self._on_key_event)
+        glfw.set_window_refresh_callback(self.window, self._on_window_refresh)
         self.key_callbacks = {}
+        self.simulation: SimulationThread = None
+
+        self.history: GenerationHistory = None
+        self.history_cursor: int = None
+        self.playback_rate = 0.0
+        self.playing = False
+        self._playback_progress = 0.0
 
     def launch(self) -> None:
         running = True
         while running:
+            # Time spent blocked waiting for events is not frame time
+            self.lastFrameTime += self.scheduler.wait(self.animating or self.playing)
             if glfw.window_should_close(self.window) or glfw.get_key(self.window,
                                                                      GLFW_CONSTANTS.GLFW_KEY_ESCAPE) == GLFW_CONSTANTS.GLFW_PRESS:
                 running = False
-            self._handle_keys()
-            self._handle_mouse()
-            glfw.poll_events()
-            self.update()
-            self.scene.update(self.deltaTime)
-            self.renderer.render(self.scene)
-            glfw.swap_buffers(self.window)
+            profiler = self.profiler
+            profiler.begin_frame()
+            with profiler.phase("input"):
+                moved = self._handle_keys()
+                self.animating = self._handle_mouse() or moved
+            with profiler.phase("simulation"):
+                self._consume_simulation_frame()
+                self._advance_playback()
+            with profiler.phase("update"):
+                self.update()
+            with profiler.phase("scene"):
+                self.scene.update(self.deltaTime)
+            drawn = self.scheduler.should_draw()
+            if drawn:
+                with profiler.phase("draw"):
+                    profiler.begin_gpu()
+                    self.renderer.render(self.scene)
+                    profiler.end_gpu()
+                with profiler.phase("swap"):
+                    glfw.swap_buffers(self.window)
+                self.scheduler.frame_drawn()
+            # The counters are only reset by render(), a skipped frame would repeat the last drawn one's
+            profiler.end_frame(self.renderer.stats if drawn else None)
             self._calculate_framerate()
+        self.stop_simulation()
+        self.close_history()
 
     @abstractmethod
     def update(self) -> None:
         pass
 
-    def _handle_keys(self) -> None:
+    def set_frame_pacing(self, mode: str, max_fps: float = None) -> None:
+        """Switch between ``unlimited``, ``vsync``, ``capped`` (at ``max_fps``) and ``on_demand`` frames.
+
+        ``on_demand`` only draws when the camera, the window or the renderer's data changed (or after
+        ``scheduler.request_redraw()``) and sleeps in between, so a paused automaton leaves the CPU idle.
+        """
+        self.scheduler = FrameScheduler(mode, self.scheduler.max_fps if max_fps is None else max_fps,
+                                        self.scheduler.idle_timeout)
+        self.renderer.scheduler = self.scheduler
+        self.scene.scheduler = self.scheduler
+        glfw.swap_interval(self.scheduler.swap_interval)
+
+    def start_profiling(self, capacity: int = None, gpu: bool = True,
+                        hook: Callable[[dict], None] = None) -> FrameProfiler:
+        """Record per-phase timings of every frame; ``self.profiler`` exports them with ``to_csv``/``to_json``."""
+        if capacity is not None and capacity != self.profiler.capacity:
+            self.profiler.destroy()
+            self.profiler = FrameProfiler(capacity, gpu)
+            self.renderer.profiler = self.profiler
+        self.profiler.gpu = gpu and self.profiler.gpu
+        if hook is not None:
+            self.profiler.hooks.append(hook)
+        self.profiler.enable()
+        return self.profiler
+
+    def stop_profiling(self) -> None:
+        self.profiler.disable()
+
+    def start_simulation(self, step: Callable[[], Any], prepare: Callable[[Any], Any] = None, rate: float = None,
+                         merge: Callable[[Any, Any], Any] = None) -> SimulationThread:
+        """Run ``step`` on a background thread; each ``prepare(state)`` result reaches ``on_simulation_frame``.
+
+        ``prepare`` runs on the simulation thread, so CPU work such as building instance data overlaps with
+        drawing; GL calls must stay in ``on_simulation_frame``. The render loop only ever picks up the
+        newest complete frame, ``merge`` combining frames it skipped.
+        """
+        self.stop_simulation()
+        # Each published frame wakes a render loop waiting for events
+        self.simulation = SimulationThread(step, prepare, rate, merge, notify=glfw.post_empty_event)
+        self.simulation.start()
+        return self.simulation
+
+    def stop_simulation(self) -> None:
+        if self.simulation is not None:
+            self.simulation.stop()
+            self.simulation = None
+
+    def on_simulation_frame(self, frame: Any) -> None:
+        pass
+
+    def _consume_simulation_frame(self) -> None:
+        if self.simulation is None:
+            return
+        frame = self.simulation.frames.take()
+        if frame is not None:
+            self.on_simulation_frame(frame)
+            self.scheduler.request_redraw()
+
+    def record_history(self, path: str, shape: tuple, keyframe_interval: int = 64,
+                       playback_rate: float = 10.0) -> GenerationHistory:
+        """Store every generation given to ``record_generation`` in ``path`` and bind the scrub keys.
+
+        LEFT/RIGHT step one generation, DOWN/UP jump 100, HOME goes to the first generation, END back to
+        the live simulation and P plays the history at ``playback_rate`` generations per second.
+        """
+        self.close_history()
+        self.history = GenerationHistory(path, shape, keyframe_interval)
+        self.playback_rate = playback_rate
+        self.add_event_key_callback(lambda: self.scrub_by(-1), GLFW_CONSTANTS.GLFW_KEY_LEFT)
+        self.add_event_key_callback(lambda: self.scrub_by(1), GLFW_CONSTANTS.GLFW_KEY_RIGHT)
+        self.add_event_key_callback(lambda: self.scrub_by(-100), GLFW_CONSTANTS.GLFW_KEY_DOWN)
+        self.add_event_key_callback(lambda: self.scrub_by(100), GLFW_CONSTANTS.GLFW_KEY_UP)
+        self.add_event_key_callback(lambda: self.scrub_to(self.history.first_generation),
+                                    GLFW_CONSTANTS.GLFW_KEY_HOME)
+        self.add_event_key_callback(self.go_live, GLFW_CONSTANTS.GLFW_KEY_END)
+        self.add_event_key_callback(self.toggle_playback, GLFW_CONSTANTS.GLFW_KEY_P)
+        return self.history
+
+    def record_generation(self, state: np.ndarray, keyframe: bool = False) -> None:
+        if self.history is not None:
+            self.history.append(state, keyframe)
+
+    def close_history(self) -> None:
+        if self.history is not None:
+            self.history.close()
+            self.history = None
+
+    def scrub_to(self, generation: int) -> None:
+        """Show a recorded generation through ``on_history_frame``; only the deltas since its keyframe are decoded."""
+        if self.history is None or len(self.history) == 0:
+            return
+        generation = min(max(generation, self.history.first_generation), self.history.last_generation)
+        self.history_cursor = generation
+        self.on_history_frame(generation, self.history.get(generation))
+
+    def scrub_by(self, offset: int) -> None:
+        if self.history is None or len(self.history) == 0:
+            return
+        cursor = self.history.last_generation if self.history_cursor is None else self.history_cursor
+        self.scrub_to(cursor + offset)
+
+    def go_live(self) -> None:
+        self.playing = False
+        if self.history_cursor is not None:
+            self.history_cursor = None
+            self.on_history_frame(None, None)
+
+    def toggle_playback(self) -> None:
+        if self.history is None or len(self.history) == 0:
+            return
+        self.playing = not self.playing
+        self._playback_progress = 0.0
+        if self.playing and (self.history_cursor is None or self.history_cursor == self.history.last_generation):
+            self.scrub_to(self.history.first_generation)
+
+    def on_history_frame(self, generation: int, state: np.ndarray) -> None:
+        """Display a recorded ``state``; both are None when scrubbing returns to the live simulation."""
+        pass
+
+    def _advance_playback(self) -> None:
+        if not self.playing:
+            return
+        self._playback_progress += self.deltaTime * self.playback_rate
+        steps = int(self._playback_progress)
+        if steps:
+            self._playback_progress -= steps
+            self.scrub_by(steps)
+            if self.history_cursor == self.history.last_generation:
+                self.playing = False
+
+    def _handle_keys(self) -> bool:
         walk_offset_lookup = {
             1: 0, 2: 90, 3: 45, 4: 180, 6: 135, 7: 90, 8: 270, 9: 315, 11: 0, 12: 225, 13: 270, 14: 180,
         }
@@ -64,7 +236,8 @@ class BaseApp(ABC):
         combo = sum(1 << i for i, key in enumerate(keys) if
                     glfw.get_key(self.window, key) == GLFW_CONSTANTS.GLFW_PRESS)
 
-        if combo in walk_offset_lookup:
+        moved = combo in walk_offset_lookup
+        if moved:
             directionModifier = walk_offset_lookup[combo]
             speed = PLAYER_SPEED
             d_pos = [
@@ -84,8 +257,10 @@ class BaseApp(ABC):
         for key, move in vertical_moves.items():
             if glfw.get_key(self.window, key) == GLFW_CONSTANTS.GLFW_PRESS:
                 self.scene.move_player(move)
+                moved = True
+        return moved
 
-    def _handle_mouse(self) -> None:
+    def _handle_mouse(self) -> bool:
         current_button_state = glfw.get_mouse_button(self.window,
                                                      GLFW_CONSTANTS.GLFW_MOUSE_BUTTON_RIGHT)
 
@@ -105,8 +280,11 @@ class BaseApp(ABC):
             theta_increment = (old_x - new_x) * sensitivity
             phi_increment = (old_y - new_y) * sensitivity
 
-            self.scene.spin_player(theta_increment, phi_increment)
-            glfw.set_cursor_pos(self.window, old_x, old_y)
+            if theta_increment or phi_increment:
+                self.scene.spin_player(theta_increment, phi_increment)
+                glfw.set_cursor_pos(self.window, old_x, old_y)
+                return True
+        return False
 
     def _calculate_framerate(self) -> None:
         self.currentTime = glfw.get_time()
@@ -122,6 +300,9 @@ class BaseApp(ABC):
             glfw.set_window_title(self.window, f"{self.window_title} - {framerate} FPS")
 
     def quit(self) -> None:
+        self.stop_simulation()
+        self.close_history()
+        self.profiler.destroy()
         self.renderer.quit()
 
     def _init_glfw(self) -> Any:
@@ -143,7 +324,7 @@ class BaseApp(ABC):
             raise Exception("Failed to create GLFW window")
         glfw.make_context_current(window)
         glfw.set_input_mode(window, GLFW_CONSTANTS.GLFW_CURSOR, GLFW_CONSTANTS.GLFW_CURSOR_NORMAL)
-        glfw.swap_interval(0)
+        glfw.swap_interval(self.scheduler.swap_interval)
         return window
 
     def set_window_title(self, title: str) -> None:
@@ -163,6 +344,9 @@ class BaseApp(ABC):
         glfw.set_window_pos(self.window, window_pos_x, window_pos_y)
         self._on_window_size_change(self.window, size.width, size.height)
 
+    def _on_window_refresh(self, window) -> None:
+        self.scheduler.request_redraw()
+
     def _on_window_size_change(self, window, width: int, height: int) -> None:
         self.window_size = WindowSize(width, height)
         glViewport(0, 0, width, height)
@@ -173,4 +357,5 @@ class BaseApp(ABC):
 
     def _on_key_event(self, window, key, scancode, action, mods) -> None:
         if action == GLFW_CONSTANTS.GLFW_PRESS and key in self.key_callbacks:
-            self.key_callbacks[key]()
\ No newline at end of file
+            self.key_callbacks[key]()
+            self.scheduler.request_redraw()
\ No newline at end of file
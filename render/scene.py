@@ -1,30 +1,71 @@
-from typing import List
+from typing import Dict, List
 
 import numpy as np
 
-from render.cube import Cube
+from render.cube import CubeArray
+from render.pacing import FrameScheduler, redraws
 from render.player import Player
 from render.utils import Position
+from render.voxels import exposed_mask
 
 
 class Scene:
     def __init__(self, position_player=Position(-6, 0, 0)) -> None:
-        self.cubes: List[Cube] = []
+        self.cubes: CubeArray = CubeArray()
         self.player: Player = Player(position_player)
+        # Set by BaseApp so that camera moves request a frame
+        self.scheduler: FrameScheduler = None
 
     def add_cube(self, x: float, y: float, z: float, texture_name: str = None) -> None:
-        self.cubes.append(Cube(Position(x, y, z), texture_name=texture_name))
+        self.cubes.append(Position(x, y, z), texture_name=texture_name)
 
+    def add_cubes_from_positions(self, positions: np.ndarray, texture_name: str = None,
+                                 eulers: np.ndarray = None) -> None:
+        self.cubes.extend(positions, eulers, self.cubes.texture_id(texture_name))
+
+    def add_cubes_from_mask(self, grid: np.ndarray, texture_name: str = None, textures: Dict[int, str] = None,
+                            offset: Position = Position(0, 0, 0), cull_hidden: bool = False) -> int:
+        """Add a cube at every non-zero cell of a 3D grid and return how many hidden cells were culled.
+
+        A boolean grid (or ``textures=None``) uses ``texture_name`` for every cell. A label grid uses
+        ``textures`` to map each state to a texture name; states missing from the mapping are skipped.
+        With ``cull_hidden`` cells whose six neighbours are all drawn are left out.
+        """
+        grid = np.asarray(grid)
+        drawn = grid != 0 if textures is None else np.isin(grid, list(textures))
+        culled = 0
+        if cull_hidden:
+            visible = exposed_mask(drawn)
+            culled = int(np.count_nonzero(drawn)) - int(np.count_nonzero(visible))
+            drawn = visible
+
+        indices = np.nonzero(drawn)
+        positions = np.column_stack(indices).astype(np.float32) + np.asarray(offset, dtype=np.float32)
+        if textures is None:
+            self.add_cubes_from_positions(positions, texture_name)
+            return culled
+
+        labels = grid[indices]
+        lookup = np.zeros(int(labels.max(initial=0)) + 1, dtype=np.int32)
+        for label, name in textures.items():
+            if 0 <= label < len(lookup):
+                lookup[label] = self.cubes.texture_id(name)
+        self.cubes.extend(positions, texture_ids=lookup[labels])
+        return culled
+
+    @redraws
     def set_player_position(self, x: float, y: float, z: float) -> None:
         self.player.position = np.array([x, y, z], dtype=np.float32)
 
     def update(self, rate: float) -> None:
         pass
 
+    @redraws
     def move_player(self, d_pos: List[float | int]) -> None:
         d_pos = np.array(d_pos, dtype=np.float32)
         self.player.position += d_pos
 
+    @redraws
     def spin_player(self, d_theta: float, d_phi: float) -> None:
         self.player.theta += d_theta
         if self.player.theta > 360:
@@ -38,4 +79,4 @@ class Scene:
         self.player.update_vectors()
 
     def delete_all_cubes(self) -> None:
-        self.cubes = []
\ No newline at end of file
+        self.cubes.clear()
\ No newline at end of file
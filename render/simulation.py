@@ -0,0 +1,96 @@
+import threading
+import time
+from typing import Any, Callable
+
+import numpy as np
+
+
+class FrameExchange:
+    """Hands the newest complete frame from a producer to a consumer; neither side waits on the other.
+
+    Frames the consumer never took are dropped, or folded into the newer one with ``merge`` when they
+    carry incremental updates.
+    """
+
+    def __init__(self, merge: Callable[[Any, Any], Any] = None) -> None:
+        self.merge = merge
+        self._lock = threading.Lock()
+        self._frame = None
+        self._fresh = False
+
+    def publish(self, frame: Any) -> None:
+        with self._lock:
+            if self._fresh and self.merge is not None:
+                frame = self.merge(self._frame, frame)
+            self._frame = frame
+            self._fresh = True
+
+    def take(self) -> Any:
+        with self._lock:
+            if not self._fresh:
+                return None
+            frame, self._frame, self._fresh = self._frame, None, False
+            return frame
+
+
+class SimulationThread(threading.Thread):
+    """Background thread calling ``step`` at ``rate`` steps per second (or as fast as possible) and
+    publishing ``prepare(state)`` for the render loop, then calling ``notify`` (e.g. to wake a waiting loop).
+
+    ``lock`` is held for a whole step, prepare and publish, so the application can change the simulation
+    safely: no frame built before it took the lock shows up after it released it.
+    """
+
+    def __init__(self, step: Callable[[], Any], prepare: Callable[[Any], Any] = None, rate: float = None,
+                 merge: Callable[[Any, Any], Any] = None, notify: Callable[[], None] = None) -> None:
+        super().__init__(daemon=True)
+        self.step = step
+        self.prepare = prepare
+        self.rate = rate
+        self.frames = FrameExchange(merge)
+        self.notify = notify
+        self.lock = threading.RLock()
+        self.steps = 0
+        self._running = threading.Event()
+        self._running.set()
+        self._stopped = threading.Event()
+
+    @property
+    def paused(self) -> bool:
+        return not self._running.is_set()
+
+    def pause(self) -> None:
+        self._running.clear()
+
+    def resume(self) -> None:
+        self._running.set()
+
+    def toggle(self) -> None:
+        self.resume() if self.paused else self.pause()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._running.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join()
+
+    def run(self) -> None:
+        next_step = time.perf_counter()
+        while not self._stopped.is_set():
+            if not self._running.wait(timeout=0.1):
+                continue
+            with self.lock:
+                state = self.step()
+                frame = self.prepare(state) if self.prepare is not None else np.copy(state)
+                self.frames.publish(frame)
+            self.steps += 1
+            if self.notify is not None:
+                self.notify()
+
+            if self.rate:
+                next_step += 1 / self.rate
+                delay = next_step - time.perf_counter()
+                if delay > 0:
+                    self._stopped.wait(delay)
+                else:
+                    next_step = time.perf_counter()
@@ -0,0 +1,19 @@
+class FrameStats:
+    def __init__(self) -> None:
+        self.bytes_uploaded = 0
+        self.draw_calls = 0
+        self.instances_drawn = 0
+        self.total_bytes_uploaded = 0
+
+    def reset_frame(self) -> None:
+        self.bytes_uploaded = 0
+        self.draw_calls = 0
+        self.instances_drawn = 0
+
+    def add_upload(self, nbytes: int) -> None:
+        self.bytes_uploaded += nbytes
+        self.total_bytes_uploaded += nbytes
+
+    def add_draw(self, instance_count: int) -> None:
+        self.draw_calls += 1
+        self.instances_drawn += instance_count
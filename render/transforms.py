@@ -0,0 +1,86 @@
+import numpy as np
+
+LATTICE_MIN = np.iinfo(np.int16).min
+LATTICE_MAX = np.iinfo(np.int16).max
+
+
+def build_model_matrices(positions: np.ndarray, eulers: np.ndarray = None, out: np.ndarray = None) -> np.ndarray:
+    """Batched equivalent of ``rotation(eulers) @ translation(position)`` as built by pyrr.
+
+    ``positions`` and ``eulers`` are (N, 3) arrays, eulers are in degrees ordered (roll, pitch, yaw).
+    The result is written into ``out`` (float32, shape (N, 4, 4)) when given.
+    """
+    positions = np.asarray(positions, dtype=np.float32).reshape(-1, 3)
+    n = positions.shape[0]
+    if out is None:
+        out = np.empty((n, 4, 4), dtype=np.float32)
+
+    out[...] = 0
+    out[:, 3, :3] = positions
+    out[:, 3, 3] = 1
+
+    if eulers is None or not np.any(eulers):
+        out[:, 0, 0] = 1
+        out[:, 1, 1] = 1
+        out[:, 2, 2] = 1
+        return out
+
+    radians = np.radians(np.asarray(eulers, dtype=np.float32).reshape(-1, 3))
+    roll, pitch, yaw = radians[:, 0], radians[:, 1], radians[:, 2]
+    s_p, c_p = np.sin(pitch), np.cos(pitch)
+    s_r, c_r = np.sin(roll), np.cos(roll)
+    s_y, c_y = np.sin(yaw), np.cos(yaw)
+
+    out[:, 0, 0] = c_y * c_p
+    out[:, 0, 1] = -c_y * s_p * c_r + s_y * s_r
+    out[:, 0, 2] = c_y * s_p * s_r + s_y * c_r
+    out[:, 1, 0] = s_p
+    out[:, 1, 1] = c_p * c_r
+    out[:, 1, 2] = -c_p * s_r
+    out[:, 2, 0] = -s_y * c_p
+    out[:, 2, 1] = s_y * s_p * c_r + c_y * s_r
+    out[:, 2, 2] = -s_y * s_p * s_r + c_y * c_r
+    return out
+
+
+def build_lattice_cells(positions: np.ndarray, layers: np.ndarray = None, out: np.ndarray = None) -> np.ndarray:
+    """Pack integer cube positions (and an optional texture layer) into int16 (N, 4) lattice cells."""
+    positions = np.asarray(positions).reshape(-1, 3)
+    cells = np.rint(positions)
+    if not np.array_equal(cells, positions):
+        raise ValueError("Lattice instancing needs cubes on integer positions")
+    if cells.size and (cells.min() < LATTICE_MIN or cells.max() > LATTICE_MAX):
+        raise ValueError(f"Lattice positions must lie in [{LATTICE_MIN}, {LATTICE_MAX}]")
+
+    if out is None:
+        out = np.empty((positions.shape[0], 4), dtype=np.int16)
+    out[:, :3] = cells
+    out[:, 3] = 0 if layers is None else layers
+    return out
+
+
+class InstanceArrayBuffer:
+    """Reusable instance storage of ``item_shape`` elements, grown geometrically."""
+
+    def __init__(self, item_shape: tuple, dtype: np.dtype, capacity: int = 0) -> None:
+        self.data: np.ndarray = np.empty((capacity,) + item_shape, dtype=dtype)
+
+    def reserve(self, count: int) -> np.ndarray:
+        if count > self.data.shape[0]:
+            capacity = max(count, 2 * self.data.shape[0])
+            self.data = np.empty((capacity,) + self.data.shape[1:], dtype=self.data.dtype)
+        return self.data[:count]
+
+
+class ModelMatrixBuffer(InstanceArrayBuffer):
+    """Reusable float32 (N, 4, 4) storage for instance model matrices."""
+
+    def __init__(self, capacity: int = 0) -> None:
+        super().__init__((4, 4), np.float32, capacity)
+
+
+class LatticeCellBuffer(InstanceArrayBuffer):
+    """Reusable int16 (N, 4) storage for lattice cells (x, y, z, layer)."""
+
+    def __init__(self, capacity: int = 0) -> None:
+        super().__init__((4,), np.int16, capacity)
@@ -0,0 +1,120 @@
+from typing import Dict
+
+import numpy as np
+from OpenGL.GL import *
+
+from render.cube_mesh import CubeMesh
+from render.material import TextureArrayMaterial
+
+# states are uint8, so the state -> layer lookup has one entry per possible value
+_STATES = 256
+
+
+class VolumeGrid:
+    """Automaton grid kept on the GPU as a ``GL_TEXTURE_3D`` of uint8 states, drawn by ray-marching its box.
+
+    The texture is laid out like the numpy grid (z fastest), so cell (x, y, z) is texel (z, y, x). States are
+    drawn with the layer of a texture array given by a small state -> layer lookup texture.
+    """
+
+    def __init__(self, cube_mesh: CubeMesh) -> None:
+        # the box is the unit cube of CubeMesh scaled to the grid in the vertex shader
+        self.vao = glGenVertexArrays(1)
+        glBindVertexArray(self.vao)
+        glBindBuffer(GL_ARRAY_BUFFER, cube_mesh.vbo)
+        glEnableVertexAttribArray(0)
+        glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, 20, ctypes.c_void_p(0))
+        self.vertex_count = cube_mesh.vertex_count
+
+        self.states = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_3D, self.states)
+        for parameter in (GL_TEXTURE_WRAP_S, GL_TEXTURE_WRAP_T, GL_TEXTURE_WRAP_R):
+            glTexParameteri(GL_TEXTURE_3D, parameter, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_3D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_3D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+
+        self.layers = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_1D, self.layers)
+        glTexParameteri(GL_TEXTURE_1D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_1D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+
+        self.material: TextureArrayMaterial = None
+        self.texture_names = []
+        self.state_layers = None
+        self.shape = None
+        # copy of what the texture holds, diffed against new grids to find the region to upload
+        self.uploaded: np.ndarray = None
+
+    def set_textures(self, textures: Dict[int, str]) -> None:
+        """Draw every state of ``textures`` with its texture; other states are empty space."""
+        names = list(dict.fromkeys(textures.values()))
+        if names != self.texture_names:
+            if self.material is not None:
+                self.material.destroy()
+            self.material = TextureArrayMaterial([f"textures/{name}" for name in names])
+            self.texture_names = names
+
+        # texture layer + 1 of every state, 0 meaning not drawn
+        state_layers = np.zeros(_STATES, dtype=np.uint8)
+        for state, name in textures.items():
+            if 0 <= state < _STATES:
+                state_layers[state] = names.index(name) + 1
+        if self.state_layers is None or not np.array_equal(state_layers, self.state_layers):
+            glBindTexture(GL_TEXTURE_1D, self.layers)
+            glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+            glTexImage1D(GL_TEXTURE_1D, 0, GL_R8UI, _STATES, 0, GL_RED_INTEGER, GL_UNSIGNED_BYTE, state_layers)
+            glPixelStorei(GL_UNPACK_ALIGNMENT, 4)
+            self.state_layers = state_layers
+
+    def upload(self, grid: np.ndarray) -> int:
+        """Bring the texture up to date with ``grid`` and return the bytes sent.
+
+        A new shape reallocates the texture; otherwise only the bounding box of the cells that differ from
+        the previous upload is sent, with a single ``glTexSubImage3D``.
+        """
+        grid = np.asarray(grid, dtype=np.uint8)
+        glBindTexture(GL_TEXTURE_3D, self.states)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        try:
+            if grid.shape != self.shape:
+                self.uploaded = np.array(grid, order="C")
+                self.shape = grid.shape
+                depth, height, width = grid.shape
+                glTexImage3D(GL_TEXTURE_3D, 0, GL_R8UI, width, height, depth, 0, GL_RED_INTEGER, GL_UNSIGNED_BYTE,
+                             self.uploaded)
+                return self.uploaded.nbytes
+
+            changed = grid != self.uploaded
+            box = []
+            for axis in range(3):
+                touched = np.flatnonzero(changed.any(axis=tuple(other for other in range(3) if other != axis)))
+                if len(touched) == 0:
+                    return 0
+                box.append(slice(touched[0], touched[-1] + 1))
+            region = np.ascontiguousarray(grid[tuple(box)])
+            self.uploaded[tuple(box)] = region
+            x, y, z = (bounds.start for bounds in box)
+            depth, height, width = region.shape
+            glTexSubImage3D(GL_TEXTURE_3D, 0, z, y, x, width, height, depth, GL_RED_INTEGER, GL_UNSIGNED_BYTE,
+                            region)
+            return region.nbytes
+        finally:
+            glPixelStorei(GL_UNPACK_ALIGNMENT, 4)
+
+    def use(self) -> None:
+        """Bind the layer textures to unit 0, the states to unit 1 and the lookup to unit 2."""
+        glActiveTexture(GL_TEXTURE1)
+        glBindTexture(GL_TEXTURE_3D, self.states)
+        glActiveTexture(GL_TEXTURE2)
+        glBindTexture(GL_TEXTURE_1D, self.layers)
+        self.material.use()
+
+    def draw(self) -> None:
+        glBindVertexArray(self.vao)
+        glDrawArrays(GL_TRIANGLES, 0, self.vertex_count)
+
+    def destroy(self) -> None:
+        if self.material is not None:
+            self.material.destroy()
+        glDeleteTextures(2, [self.states, self.layers])
+        glDeleteVertexArrays(1, [self.vao])
@@ -0,0 +1,50 @@
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+from OpenGL.GL import *
+
+
+class VoxelMesh:
+    """GPU buffer holding a merged voxel surface built by ``render.voxels.greedy_mesh``."""
+
+    def __init__(self) -> None:
+        self.vao = glGenVertexArrays(1)
+        glBindVertexArray(self.vao)
+
+        self.vbo = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+
+        glEnableVertexAttribArray(0)
+        glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, 20, ctypes.c_void_p(0))
+
+        glEnableVertexAttribArray(1)
+        glVertexAttribPointer(1, 2, GL_FLOAT, GL_FALSE, 20, ctypes.c_void_p(12))
+
+        self.capacity = 0
+        self.ranges: Dict[str, Tuple[int, int]] = {}
+
+    @property
+    def vertex_count(self) -> int:
+        return sum(count for _, count in self.ranges.values())
+
+    def upload(self, vertices: np.ndarray, ranges: Dict[str, Tuple[int, int]]) -> int:
+        vertices = np.ascontiguousarray(vertices, dtype=np.float32)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        if vertices.nbytes > self.capacity:
+            self.capacity = max(vertices.nbytes, 2 * self.capacity)
+        glBufferData(GL_ARRAY_BUFFER, self.capacity, None, GL_DYNAMIC_DRAW)
+        if vertices.nbytes:
+            glBufferSubData(GL_ARRAY_BUFFER, 0, vertices.nbytes, vertices)
+        self.ranges = ranges
+        return vertices.nbytes
+
+    def draw(self, use_texture: Callable[[str], None]) -> int:
+        glBindVertexArray(self.vao)
+        for texture_name, (first, count) in self.ranges.items():
+            use_texture(texture_name)
+            glDrawArrays(GL_TRIANGLES, first, count)
+        return len(self.ranges)
+
+    def destroy(self) -> None:
+        glDeleteBuffers(1, [self.vbo])
+        glDeleteVertexArrays(1, [self.vao])
@@ -0,0 +1,130 @@
+from typing import Dict, Tuple
+
+import numpy as np
+
+from render.utils import Position
+
+
+def exposed_mask(occupied: np.ndarray) -> np.ndarray:
+    """Occupied cells with at least one empty 6-neighbour (cells outside the grid count as empty)."""
+    occupied = np.asarray(occupied, dtype=bool)
+    padded = np.pad(occupied, 1, constant_values=False)
+    enclosed = occupied.copy()
+    enclosed &= padded[2:, 1:-1, 1:-1]
+    enclosed &= padded[:-2, 1:-1, 1:-1]
+    enclosed &= padded[1:-1, 2:, 1:-1]
+    enclosed &= padded[1:-1, :-2, 1:-1]
+    enclosed &= padded[1:-1, 1:-1, 2:]
+    enclosed &= padded[1:-1, 1:-1, :-2]
+    return occupied & ~enclosed
+
+
+# (normal axis, u axis, v axis) with u x v pointing along the normal so quads wind counter-clockwise
+_FACE_AXES = ((0, 1, 2), (1, 2, 0), (2, 0, 1))
+
+
+def greedy_mesh(grid: np.ndarray, textures: Dict[int, str],
+                offset: Position = Position(0, 0, 0)) -> Tuple[np.ndarray, Dict[str, Tuple[int, int]]]:
+    """Build the merged surface of a 3D state grid.
+
+    Faces between two drawn cells are dropped and coplanar faces of the same state are merged into
+    rectangles. Returns float32 (M, 5) ``x, y, z, u, v`` triangle vertices, where uv counts cells so
+    textures repeat once per cube face, and for every texture its ``(first, count)`` vertex range.
+    """
+    grid = np.asarray(grid)
+    states = list(textures)
+    lookup = np.zeros(max([int(grid.max(initial=0))] + states) + 1, dtype=np.int32)
+    for i, state in enumerate(states):
+        lookup[state] = i + 1
+    labels = lookup[grid.astype(np.intp, copy=False)]
+    padded = np.pad(labels > 0, 1, constant_values=False)
+
+    vertices = []
+    vertex_labels = []
+    for normal_axis, u_axis, v_axis in _FACE_AXES:
+        for sign in (1, -1):
+            neighbour = [slice(1, -1)] * 3
+            neighbour[normal_axis] = slice(2, None) if sign > 0 else slice(None, -2)
+            faces = np.where(padded[tuple(neighbour)], 0, labels)
+            faces = faces.transpose(normal_axis, u_axis, v_axis)
+            s, u0, u1, v0, v1, label = _merge_faces(faces)
+            if len(s) == 0:
+                continue
+            quad = _quad_vertices(s, u0, u1, v0, v1, sign, (normal_axis, u_axis, v_axis))
+            vertices.append(quad)
+            vertex_labels.append(label)
+
+    if not vertices:
+        return np.empty((0, 5), dtype=np.float32), {}
+
+    vertices = np.concatenate(vertices)
+    vertex_labels = np.concatenate(vertex_labels)
+    order = np.argsort(vertex_labels, kind="stable")
+    vertices = vertices[order].reshape(-1, 5)
+    vertices[:, :3] += np.asarray(offset, dtype=np.float32)
+
+    counts = np.bincount(vertex_labels, minlength=len(states) + 1)
+    ranges = {}
+    first = 0
+    for i, state in enumerate(states):
+        count = int(counts[i + 1]) * 6
+        if count:
+            ranges[textures[state]] = (first, count)
+        first += count
+    return vertices, ranges
+
+
+def _merge_faces(faces: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """Merge the visible faces of a (slices, u, v) label array into rectangles.
+
+    Runs of equal labels along v are found for every row at once, then runs with the same slice,
+    extent and label on consecutive rows are fused along u.
+    """
+    _, u_size, v_size = faces.shape
+    rows = np.zeros((faces.shape[0] * u_size, v_size + 2), dtype=faces.dtype)
+    rows[:, 1:-1] = faces.reshape(-1, v_size)
+    change = rows[:, 1:] != rows[:, :-1]
+    start_row, v0 = np.nonzero(change & (rows[:, 1:] != 0))
+    _, end = np.nonzero(change & (rows[:, :-1] != 0))
+    v1 = end - 1
+    label = rows[start_row, v0 + 1]
+    s, u = np.divmod(start_row, u_size)
+
+    order = np.lexsort((u, label, v1, v0, s))
+    s, u, v0, v1, label = s[order], u[order], v0[order], v1[order], label[order]
+    new_rect = np.ones(len(s), dtype=bool)
+    new_rect[1:] = ((s[1:] != s[:-1]) | (v0[1:] != v0[:-1]) | (v1[1:] != v1[:-1])
+                    | (label[1:] != label[:-1]) | (u[1:] != u[:-1] + 1))
+    first = np.flatnonzero(new_rect)
+    last = np.append(first[1:] - 1, len(s) - 1)
+    return s[first], u[first], u[last], v0[first], v1[first], label[first]
+
+
+def _quad_vertices(s: np.ndarray, u0: np.ndarray, u1: np.ndarray, v0: np.ndarray, v1: np.ndarray,
+                   sign: int, axes: Tuple[int, int, int]) -> np.ndarray:
+    n = len(s)
+    u_lo, u_hi = u0 - 0.5, u1 + 0.5
+    v_lo, v_hi = v0 - 0.5, v1 + 0.5
+    width = (u1 - u0 + 1).astype(np.float32)
+    height = (v1 - v0 + 1).astype(np.float32)
+    zero = np.zeros(n, dtype=np.float32)
+
+    # corners (u, v, tex_u, tex_v) in counter-clockwise order seen from the normal side
+    corners = [
+        (u_lo, v_lo, zero, zero),
+        (u_hi, v_lo, width, zero),
+        (u_hi, v_hi, width, height),
+        (u_lo, v_hi, zero, height),
+    ]
+    triangles = (0, 1, 2, 0, 2, 3) if sign > 0 else (0, 2, 1, 0, 3, 2)
+
+    quad = np.empty((n, 6, 5), dtype=np.float32)
+    normal_axis, u_axis, v_axis = axes
+    quad[:, :, normal_axis] = (s + 0.5 * sign)[:, None]
+    for i, corner in enumerate(triangles):
+        u, v, tex_u, tex_v = corners[corner]
+        quad[:, i, u_axis] = u
+        quad[:, i, v_axis] = v
+        quad[:, i, 3] = tex_u
+        quad[:, i, 4] = tex_v
+    return quad
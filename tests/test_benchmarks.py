@@ -0,0 +1,13 @@
+from benchmarks.suite import CASES, compare, run_suite
+
+
+def test_every_case_runs_without_a_gl_context():
+    results = run_suite(sizes=[16], densities=[0.3], repeat=1)
+    assert set(results) == {f"{name}/16/0.3" for name in CASES}
+    assert all(result["processed"] > 0 for result in results.values())
+
+
+def test_compare_flags_slowdowns_and_memory_growth():
+    baseline = {"case/16/0.3": {"throughput": 100.0, "peak_bytes": 1000, "unit": "cells"}}
+    assert compare({"case/16/0.3": {"throughput": 95.0, "peak_bytes": 1050, "unit": "cells"}}, baseline) == []
+    assert len(compare({"case/16/0.3": {"throughput": 50.0, "peak_bytes": 2000, "unit": "cells"}}, baseline)) == 2
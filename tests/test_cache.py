@@ -0,0 +1,32 @@
+import os
+
+from render.cache import _program_key
+
+DRIVER = [b"vendor", b"renderer", b"3.3"]
+
+
+def test_program_key_follows_shader_files(tmp_path):
+    vertex = tmp_path / "vertex.txt"
+    fragment = tmp_path / "fragment.txt"
+    vertex.write_text("void main() {}")
+    fragment.write_text("void main() {}")
+    shaders = [(str(vertex), 1), (str(fragment), 2)]
+    key = _program_key(shaders, DRIVER)
+    assert _program_key(shaders, DRIVER) == key
+
+    vertex.write_text("void main() { }")
+    assert _program_key(shaders, DRIVER) != key
+
+    # same size, only the mtime moves
+    key = _program_key(shaders, DRIVER)
+    stat = fragment.stat()
+    os.utime(fragment, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert _program_key(shaders, DRIVER) != key
+
+
+def test_program_key_follows_driver_and_stages(tmp_path):
+    source = tmp_path / "shader.txt"
+    source.write_text("void main() {}")
+    key = _program_key([(str(source), 1)], DRIVER)
+    assert _program_key([(str(source), 1)], [b"vendor", b"renderer", b"4.6"]) != key
+    assert _program_key([(str(source), 2)], DRIVER) != key
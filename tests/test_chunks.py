@@ -0,0 +1,42 @@
+import numpy as np
+
+from render.chunks import ChunkedGrid
+from render.graphics import CpuGraphicsEngine
+
+TEXTURES = {1: "gray_bordure.png"}
+
+
+def drawn_count(levels) -> int:
+    return sum(len(data) for data, _ in levels[0].values())
+
+
+def test_only_changed_chunks_are_rebuilt():
+    grid = np.zeros((32, 32, 32), dtype=np.uint8)
+    chunked = ChunkedGrid(16, cull_hidden=False)
+    assert len(chunked.update(grid)) == 8
+    grid[3, 3, 3] = 1
+    assert chunked.update(grid) == [(0, 0, 0)]
+
+
+def test_shrinking_grid_empties_chunks_outside_it():
+    engine = CpuGraphicsEngine(lattice=True)
+    engine.chunk_size = 16
+    updates = engine.build_chunk_updates(np.ones((32, 32, 32), dtype=np.uint8), TEXTURES)
+    assert len(updates) == 8
+
+    updates = engine.build_chunk_updates(np.ones((16, 16, 16), dtype=np.uint8), TEXTURES)
+    assert drawn_count(updates[(0, 0, 0)]) > 0
+    assert set(updates) == set(np.ndindex(2, 2, 2))
+    assert all(drawn_count(levels) == 0 for chunk, levels in updates.items() if chunk != (0, 0, 0))
+
+
+def test_reset_grid_empties_chunks_left_out():
+    engine = CpuGraphicsEngine(lattice=True, lod=True)
+    engine.chunk_size = 16
+    engine.build_chunk_updates(np.ones((32, 16, 16), dtype=np.uint8), TEXTURES)
+    # as done by applications forcing a full rebuild, here also switching the culling mode
+    engine.chunked_grid = None
+    updates = engine.build_chunk_updates(np.ones((16, 16, 16), dtype=np.uint8), TEXTURES, cull_hidden=False)
+    assert drawn_count(updates[(0, 0, 0)]) == 16 ** 3
+    assert drawn_count(updates[(1, 0, 0)]) == 0
+    assert len(updates[(1, 0, 0)]) == engine.lod_levels + 1
@@ -0,0 +1,33 @@
+import numpy as np
+import pyrr
+
+from render.culling import ChunkIndex, boxes_visible, frustum_planes
+
+
+def camera_planes() -> np.ndarray:
+    view = pyrr.matrix44.create_look_at(eye=(0, 0, 0), target=(0, 0, -1), up=(0, 1, 0), dtype=np.float32)
+    projection = pyrr.matrix44.create_perspective_projection(fovy=45, aspect=1, near=0.1, far=100,
+                                                             dtype=np.float32)
+    return frustum_planes(view, projection)
+
+
+def test_boxes_visible():
+    centres = np.array([
+        (0, 0, -10),  # in front
+        (0, 0, 10),  # behind
+        (0, 0, -150),  # past the far plane
+        (50, 0, -10),  # off to the side
+        (0, 0, -99.5),  # across the far plane
+        (0, 0, 0),  # around the camera
+    ], dtype=np.float32)
+    visible = boxes_visible(centres - 1, centres + 1, camera_planes())
+    assert visible.tolist() == [True, False, False, False, True, True]
+
+
+def test_visible_ranges_merge_neighbouring_chunks():
+    # chunks already sorted by key, as the renderer keeps them
+    positions = np.array([(0, 0, -10), (1, 0, -10), (0, 0, -20), (0, 0, 10), (0, 0, -30)], dtype=np.float32)
+    keys = np.array([0, 0, 1, 2, 3])
+    index = ChunkIndex(positions, keys)
+    assert len(index) == 4
+    assert index.visible_ranges(camera_planes()) == [(0, 3), (4, 1)]
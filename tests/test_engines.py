@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from automata.automaton import CellularAutomaton
+from automata.rules import compile_rule
+from automata.runner import random_grid
+
+RULES = ("B14-19/S13-26", "B5/S4-6", "/2/3")
+
+
+@pytest.mark.parametrize("rule_string", RULES)
+def test_sparse_matches_dense(rule_string):
+    rule = compile_rule(rule_string)
+    # a small seed in a large empty grid, so most blocks stay inactive
+    grid = np.zeros((48, 48, 48), dtype=np.uint8)
+    grid[18:30, 18:30, 18:30] = random_grid((12, 12, 12), 0.3, seed=0, states=rule.states)
+    dense = CellularAutomaton(grid, rule)
+    sparse = CellularAutomaton(grid, rule, sparse=True, block_size=8, dense_threshold=1.0)
+    for _ in range(6):
+        np.testing.assert_array_equal(sparse.step(), dense.step())
+        assert sparse.active_fraction < 1.0
+
+
+@pytest.mark.parametrize("rule_string, shape, boundary", [
+    ("B14-19/S13-26", (20, 20, 70), "constant"),
+    ("B5/S4-6", (12, 12, 64), "periodic"),
+    ("B1/S1-2/N", (16, 16, 130), "constant"),
+])
+def test_bit_packed_matches_dense(rule_string, shape, boundary):
+    from automata.bitgrid import BitPackedAutomaton
+
+    rule = compile_rule(rule_string)
+    grid = random_grid(shape, 0.3, seed=0)
+    dense = CellularAutomaton(grid, rule, boundary=boundary)
+    packed = BitPackedAutomaton(grid, rule, boundary=boundary)
+    for _ in range(4):
+        dense.step()
+        packed.step()
+        np.testing.assert_array_equal(packed.state, dense.state)
+
+
+@pytest.mark.parametrize("boundary", ["constant", "periodic"])
+def test_parallel_matches_dense(boundary):
+    from automata.parallel import ParallelAutomaton
+
+    rule = compile_rule("/2/3")
+    grid = random_grid((24, 16, 16), 0.3, seed=0, states=rule.states)
+    dense = CellularAutomaton(grid, rule, boundary=boundary)
+    with ParallelAutomaton(grid, rule, workers=3, boundary=boundary) as parallel:
+        np.testing.assert_array_equal(parallel.step(5), dense.step(5))
+
+
+@pytest.mark.parametrize("rule_string", ["B14-19/S13-26", "B5/S4-6", "B4/S3-5/N"])
+def test_hashlife_matches_dense(rule_string):
+    from automata.hashlife import HashLifeAutomaton
+
+    rule = compile_rule(rule_string)
+    # HashLife runs on an unbounded lattice: keep the pattern away from the dense grid's border
+    grid = np.zeros((40, 40, 40), dtype=np.uint8)
+    grid[16:24, 16:24, 16:24] = random_grid((8, 8, 8), 0.5, seed=0)
+    dense = CellularAutomaton(grid, rule)
+    hashlife = HashLifeAutomaton(grid, rule)
+    for n in (1, 2, 3):
+        dense.step(n)
+        hashlife.step(n)
+        np.testing.assert_array_equal(hashlife.state, dense.state)
+    assert hashlife.population == np.count_nonzero(dense.state)
+
+
+def test_hashlife_rejects_unsupported_rules():
+    from automata.hashlife import HashLifeAutomaton
+
+    grid = np.zeros((8, 8, 8), dtype=np.uint8)
+    with pytest.raises(ValueError):
+        HashLifeAutomaton(grid, compile_rule("/2/3"))
+    with pytest.raises(ValueError):
+        HashLifeAutomaton(grid, compile_rule("B0/S1"))
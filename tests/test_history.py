@@ -0,0 +1,44 @@
+import os
+import struct
+
+import numpy as np
+
+from automata.automaton import CellularAutomaton
+from automata.history import INDEX_MAGIC, GenerationHistory
+from automata.rules import compile_rule
+
+
+def record(path, generations: int = 40, keyframe_interval: int = 8):
+    rng = np.random.default_rng(0)
+    automaton = CellularAutomaton((rng.random((16, 16, 16)) < 0.3).astype(np.uint8), compile_rule("/2/3"))
+    states = [automaton.state.copy()]
+    with GenerationHistory(path, automaton.shape, keyframe_interval) as history:
+        history.append(automaton.state)
+        for _ in range(generations):
+            states.append(automaton.step().copy())
+            history.append(automaton.state)
+    return states
+
+
+def test_random_and_reverse_access(tmp_path):
+    path = str(tmp_path / "run.cah")
+    states = record(path)
+    with GenerationHistory(path) as history:
+        assert len(history) == len(states)
+        order = list(np.random.default_rng(1).permutation(len(states))) + list(reversed(range(len(states))))
+        for generation in order:
+            np.testing.assert_array_equal(history.get(generation), states[generation])
+
+
+def test_index_rebuilt_without_footer(tmp_path):
+    path = str(tmp_path / "run.cah")
+    states = record(path)
+    # drop the index and footer written on close, as after a crash
+    with open(path, "r+b") as file:
+        file.seek(-24, os.SEEK_END)
+        index_offset, _, magic = struct.unpack("<qq8s", file.read())
+        assert magic == INDEX_MAGIC
+        file.truncate(index_offset)
+    with GenerationHistory(path) as history:
+        assert history.last_generation == len(states) - 1
+        np.testing.assert_array_equal(history.get(len(states) - 1), states[-1])
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from automata.runner import random_grid
+from render.lod import OccupancyPyramid
+
+
+@pytest.mark.parametrize("states, threshold", [(2, 1), (2, 4), (4, 1), (4, 4)])
+def test_incremental_update_matches_rebuild(states, threshold):
+    rng = np.random.default_rng(0)
+    grid = random_grid((21, 16, 10), 0.3, seed=0, states=states)
+    pyramid = OccupancyPyramid(depth=3, states=states, threshold=threshold)
+    pyramid.update(grid)
+    for _ in range(5):
+        changed = rng.random(grid.shape) < 0.02
+        grid = np.where(changed, rng.integers(0, states, grid.shape), grid).astype(np.uint8)
+        pyramid.update(grid, changed)
+
+        rebuilt = OccupancyPyramid(depth=3, states=states, threshold=threshold)
+        rebuilt.update(grid)
+        assert [level.shape for level in pyramid.levels] == [(21, 16, 10), (11, 8, 5), (6, 4, 3), (3, 2, 2)]
+        for level, expected in zip(pyramid.levels, rebuilt.levels):
+            np.testing.assert_array_equal(level, expected)
+
+
+def test_coarse_cell_takes_the_most_common_state():
+    grid = np.zeros((2, 2, 2), dtype=np.uint8)
+    grid[0] = 1
+    grid[1, 0, 0] = 2
+    pyramid = OccupancyPyramid(depth=1, states=3, threshold=4)
+    pyramid.update(grid)
+    assert pyramid.levels[1].tolist() == [[[1]]]
+
+    grid[0, 0] = 0
+    pyramid.update(grid, grid == 0)
+    # only three of eight children occupied
+    assert pyramid.levels[1].tolist() == [[[0]]]
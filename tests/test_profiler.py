@@ -0,0 +1,51 @@
+import numpy as np
+
+from render.profiler import FrameProfiler
+from render.stats import FrameStats
+
+
+def test_enabling_mid_frame_skips_that_frame():
+    profiler = FrameProfiler(capacity=8, gpu=False)
+    profiler.begin_frame()
+    profiler.enable()
+    with profiler.phase("update"):
+        pass
+    profiler.end_frame()
+    assert profiler.frame == 0
+
+    profiler.begin_frame()
+    with profiler.phase("update"):
+        pass
+    profiler.end_frame()
+    history = profiler.history()
+    assert profiler.frame == 1
+    assert 0 <= history["cpu"][0] < 1000
+    assert np.isnan(history["gpu"][0])
+
+
+def test_nested_phases_count_exclusive_time():
+    profiler = FrameProfiler(capacity=4, gpu=False)
+    profiler.enable()
+    profiler.begin_frame()
+    with profiler.phase("update"):
+        with profiler.phase("instances"):
+            sum(range(100000))
+    profiler.end_frame()
+    summary = profiler.summary()
+    assert summary["instances"] > 0
+    assert summary["update"] + summary["instances"] <= summary["cpu"] + 1e-6
+
+
+def test_frame_without_stats_has_zero_counters():
+    stats = FrameStats()
+    stats.add_draw(10)
+    stats.add_upload(64)
+    profiler = FrameProfiler(capacity=4, gpu=False)
+    profiler.enable()
+    for frame_stats in (stats, None):
+        profiler.begin_frame()
+        profiler.end_frame(frame_stats)
+    history = profiler.history()
+    assert history["draw_calls"].tolist() == [1, 0]
+    assert history["instances_drawn"].tolist() == [10, 0]
+    assert history["bytes_uploaded"].tolist() == [64, 0]
@@ -0,0 +1,44 @@
+import numpy as np
+
+from automata.automaton import CellularAutomaton
+from automata.rules import compile_rule
+
+
+def reference_step(state: np.ndarray, rule) -> np.ndarray:
+    """Dense Moore step of a constant (zero) boundary grid, with no shared buffers."""
+    alive = np.pad(state == rule.counted_state, 1).astype(np.intp)
+    counts = sum(np.roll(alive, (dx, dy, dz), axis=(0, 1, 2))
+                 for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)
+                 if (dx, dy, dz) != (0, 0, 0))[1:-1, 1:-1, 1:-1]
+    return rule.table[state.astype(np.intp), counts]
+
+
+def test_apply_with_many_states():
+    rng = np.random.default_rng(0)
+    for rule_string in ("B4/S4/C12", "B4/S4/C255"):
+        rule = compile_rule(rule_string)
+        state = rng.integers(0, rule.states, (8, 8, 8), dtype=np.uint8)
+        counts = rng.integers(0, rule.count_size, (8, 8, 8), dtype=np.uint8)
+        out = np.empty_like(state)
+        rule.apply(state, counts, out, np.empty(state.shape, dtype=np.intp))
+        np.testing.assert_array_equal(out, rule.table[state.astype(np.intp), counts])
+
+
+def test_step_matches_reference():
+    rng = np.random.default_rng(1)
+    for rule_string in ("B14-19/S13-26", "/2/3", "B4/S4/C12"):
+        rule = compile_rule(rule_string)
+        state = rng.integers(0, rule.states, (20, 20, 20), dtype=np.uint8)
+        automaton = CellularAutomaton(state, rule)
+        for _ in range(3):
+            expected = reference_step(automaton.state, rule)
+            np.testing.assert_array_equal(automaton.step(), expected)
+
+
+def test_parallel_step_with_many_states():
+    from automata.parallel import ParallelAutomaton
+
+    rule = compile_rule("B4/S4/C12")
+    state = np.random.default_rng(2).integers(0, rule.states, (20, 20, 20), dtype=np.uint8)
+    with ParallelAutomaton(state, rule, workers=2) as automaton:
+        np.testing.assert_array_equal(automaton.step(), reference_step(state, rule))
@@ -0,0 +1,39 @@
+import itertools
+import time
+
+from render.simulation import FrameExchange, SimulationThread
+
+
+def test_frame_exchange_merges_skipped_frames():
+    frames = FrameExchange(merge=lambda older, newer: {**older, **newer})
+    assert frames.take() is None
+    frames.publish({"a": 1, "b": 1})
+    frames.publish({"b": 2})
+    assert frames.take() == {"a": 1, "b": 2}
+    assert frames.take() is None
+
+
+class SlowExchange(FrameExchange):
+    def publish(self, frame):
+        # widens the gap between building a frame and publishing it
+        time.sleep(0.001)
+        super().publish(frame)
+
+
+def test_no_frame_from_before_the_lock_arrives_after_it():
+    counter = itertools.count()
+    simulation = SimulationThread(lambda: next(counter), prepare=lambda generation: generation)
+    simulation.frames = SlowExchange()
+    simulation.start()
+    try:
+        for _ in range(50):
+            with simulation.lock:
+                # what the application would rebuild from, with the frames built so far already applied
+                simulation.frames.take()
+                rebuilt = next(counter)
+            frame = None
+            while frame is None:
+                frame = simulation.frames.take()
+            assert frame > rebuilt
+    finally:
+        simulation.stop()
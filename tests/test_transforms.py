@@ -0,0 +1,41 @@
+import numpy as np
+import pyrr
+import pytest
+
+from render.transforms import ModelMatrixBuffer, build_lattice_cells, build_model_matrices
+
+
+def pyrr_model_matrix(position: np.ndarray, euler: np.ndarray) -> np.ndarray:
+    return pyrr.matrix44.create_from_eulers(np.radians(euler), dtype=np.float32) @ \
+        pyrr.matrix44.create_from_translation(position, dtype=np.float32)
+
+
+def test_model_matrices_match_pyrr():
+    rng = np.random.default_rng(0)
+    positions = rng.uniform(-100, 100, (64, 3)).astype(np.float32)
+    eulers = rng.uniform(-360, 360, (64, 3)).astype(np.float32)
+    matrices = build_model_matrices(positions, eulers)
+    for matrix, position, euler in zip(matrices, positions, eulers):
+        np.testing.assert_allclose(matrix, pyrr_model_matrix(position, euler), atol=1e-4)
+
+
+def test_identity_rotation_matches_pyrr():
+    positions = np.random.default_rng(1).uniform(-100, 100, (16, 3)).astype(np.float32)
+    for eulers in (None, np.zeros((16, 3), dtype=np.float32)):
+        matrices = build_model_matrices(positions, eulers)
+        for matrix, position in zip(matrices, positions):
+            np.testing.assert_allclose(matrix, pyrr_model_matrix(position, np.zeros(3)), atol=1e-6)
+
+
+def test_model_matrices_reuse_out_buffer():
+    buffer = ModelMatrixBuffer()
+    positions = np.arange(12, dtype=np.float32).reshape(4, 3)
+    out = buffer.reserve(4)
+    assert build_model_matrices(positions, out=out) is out
+    np.testing.assert_array_equal(out[:, 3, :3], positions)
+
+
+def test_lattice_cells_reject_fractional_positions():
+    np.testing.assert_array_equal(build_lattice_cells([[1, 2, 3]], [5]), [[1, 2, 3, 5]])
+    with pytest.raises(ValueError):
+        build_lattice_cells([[0.5, 0, 0]])
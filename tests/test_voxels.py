@@ -0,0 +1,77 @@
+import numpy as np
+
+from automata.runner import random_grid
+from render.utils import Position
+from render.voxels import exposed_mask, greedy_mesh
+
+
+def test_exposed_mask_drops_only_enclosed_cells():
+    occupied = np.zeros((7, 7, 7), dtype=bool)
+    occupied[1:6, 1:6, 1:6] = True
+    exposed = exposed_mask(occupied)
+    expected = occupied.copy()
+    expected[2:5, 2:5, 2:5] = False
+    np.testing.assert_array_equal(exposed, expected)
+
+    # a hole uncovers its six neighbours
+    occupied[3, 3, 3] = False
+    expected[3, 3, 3] = False
+    for axis in range(3):
+        for step in (-1, 1):
+            cell = [3, 3, 3]
+            cell[axis] += step
+            expected[tuple(cell)] = True
+    np.testing.assert_array_equal(exposed_mask(occupied), expected)
+
+
+def test_cells_on_the_grid_border_are_exposed():
+    occupied = np.ones((3, 3, 3), dtype=bool)
+    expected = np.ones((3, 3, 3), dtype=bool)
+    expected[1, 1, 1] = False
+    np.testing.assert_array_equal(exposed_mask(occupied), expected)
+    assert not exposed_mask(np.zeros((3, 3, 3), dtype=bool)).any()
+
+
+def triangle_normals(vertices: np.ndarray) -> np.ndarray:
+    a, b, c = (vertices[:, :3].reshape(-1, 3, 3)[:, i] for i in range(3))
+    return np.cross(b - a, c - a)
+
+
+def test_greedy_mesh_of_a_box_is_six_outward_quads():
+    grid = np.zeros((4, 5, 6), dtype=np.uint8)
+    grid[1:3, 1:4, 1:5] = 1
+    vertices, ranges = greedy_mesh(grid, {1: "stone.png"}, offset=Position(10, 0, 0))
+    assert ranges == {"stone.png": (0, 36)}
+    assert vertices.shape == (36, 5)
+    np.testing.assert_allclose(vertices[:, :3].min(axis=0), (10.5, 0.5, 0.5))
+    np.testing.assert_allclose(vertices[:, :3].max(axis=0), (12.5, 3.5, 4.5))
+
+    # counter-clockwise seen from outside: every normal points away from the centre
+    normals = triangle_normals(vertices)
+    centres = vertices[:, :3].reshape(-1, 3, 3).mean(axis=1)
+    assert np.all(np.einsum("ij,ij->i", normals, centres - (11.5, 2.0, 2.5)) > 0)
+    # uv counts cells, so the texture repeats once per cube face
+    areas = np.linalg.norm(normals, axis=1) / 2
+    assert areas.sum() == 2 * (2 * 3 + 3 * 4 + 2 * 4)
+    uv = vertices[:, 3:].reshape(-1, 3, 2)
+    first, second = uv[:, 1] - uv[:, 0], uv[:, 2] - uv[:, 0]
+    uv_areas = np.abs(first[:, 0] * second[:, 1] - first[:, 1] * second[:, 0]) / 2
+    np.testing.assert_allclose(uv_areas, areas)
+
+
+def test_greedy_mesh_keeps_states_apart():
+    grid = np.array([[[1]], [[2]]], dtype=np.uint8)
+    vertices, ranges = greedy_mesh(grid, {1: "a.png", 2: "b.png"})
+    # the shared face is dropped, the other five faces of each cell stay separate
+    assert ranges == {"a.png": (0, 30), "b.png": (30, 30)}
+    assert np.all(vertices[:30, 0] <= 0.5) and np.all(vertices[30:, 0] >= 0.5)
+
+
+def test_greedy_mesh_area_matches_exposed_faces():
+    grid = random_grid((9, 7, 8), 0.4, seed=0, states=3)
+    vertices, ranges = greedy_mesh(grid, {1: "a.png", 2: "b.png"})
+    drawn = np.pad(grid > 0, 1)
+    faces = sum(np.count_nonzero(np.diff(drawn, axis=axis)) for axis in range(3))
+    assert np.linalg.norm(triangle_normals(vertices), axis=1).sum() / 2 == faces
+    assert sum(count for _, count in ranges.values()) == len(vertices)
+    assert len(vertices) < faces * 6